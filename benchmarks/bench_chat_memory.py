@@ -0,0 +1,86 @@
+"""
+Per-turn latency of the chat memory backends.
+
+A "turn" is what RAGService.generate_response does against memory:
+one get_messages() followed by two add_message() calls.
+
+    python -m benchmarks.bench_chat_memory --turns 2000 --sessions 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.append('.')
+
+from benchmarks.common import HEADER, format_row, percentiles
+from chat_memory_base import ChatMemory
+from local_memory import InMemoryChatMemory, SQLiteChatMemory
+
+
+async def run_turns(memory: ChatMemory, turns: int, sessions: int) -> List[float]:
+    """Run chat turns round-robin over sessions and return per-turn latencies"""
+    await memory.connect()
+    samples = []
+    for i in range(turns):
+        session_id = f"bench-{i % sessions}"
+        start = time.perf_counter()
+        await memory.get_messages(session_id)
+        await memory.add_message(session_id, "user", f"question {i}")
+        await memory.add_message(session_id, "assistant", f"answer {i}")
+        samples.append((time.perf_counter() - start) * 1000)
+    for s in range(sessions):
+        await memory.clear_messages(f"bench-{s}")
+    await memory.disconnect()
+    return samples
+
+
+async def redis_backend():
+    """Return a Redis memory if a server (or fakeredis) is available, else None"""
+    from redis_memory import RedisChatMemory
+
+    memory = RedisChatMemory()
+    try:
+        await memory.connect()
+        await memory.client.ping()
+        return memory
+    except Exception:
+        await memory.disconnect()
+    try:
+        import fakeredis
+    except ImportError:
+        return None
+    memory.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return memory
+
+
+async def main(turns: int, sessions: int):
+    tmp_dir = tempfile.mkdtemp()
+    backends = {
+        "memory": InMemoryChatMemory(),
+        "sqlite": SQLiteChatMemory(path=os.path.join(tmp_dir, "chat_memory.db")),
+    }
+    redis_memory = await redis_backend()
+    if redis_memory is not None:
+        backends["redis"] = redis_memory
+    else:
+        print("⚠️  Redis not reachable and fakeredis not installed, skipping redis backend")
+
+    print(HEADER.replace("(ms)", "(ms per turn)"))
+    results = {}
+    for name, memory in backends.items():
+        stats = percentiles(await run_turns(memory, turns, sessions))
+        results[name] = stats
+        print(format_row(name, stats))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.sessions))
@@ -0,0 +1,85 @@
+"""
+Memory, query latency and recall of the local vector store compressions.
+
+Vectors are synthetic clustered embeddings (normalised, like the store keeps
+them); recall@k is measured against exact float32 search over the same data.
+
+    python -m benchmarks.bench_quantization --vectors 100000 --queries 200 --k 10
+"""
+import argparse
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.append('.')
+
+from benchmarks.common import HEADER, format_row, percentiles
+from services.quantization import COMPRESSIONS
+from services.vectorstore_local import LocalVectorStore
+
+ADD_BATCH = 10000
+
+
+def clustered_vectors(n: int, centres: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Points scattered around the centres, roughly how sentence embeddings group by topic"""
+    noise = rng.normal(scale=0.5, size=(n, centres.shape[1])).astype(np.float32)
+    points = centres[rng.integers(0, len(centres), n)] + noise
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    scores = queries @ vectors.T
+    return [set(np.argpartition(-row, k - 1)[:k].tolist()) for row in scores]
+
+
+def run_mode(compression: str, vectors: np.ndarray, queries: np.ndarray, truth: List[set], k: int) -> Dict[str, float]:
+    store = LocalVectorStore(dimension=vectors.shape[1], compression=compression, data_dir=None)
+    start = time.perf_counter()
+    for i in range(0, len(vectors), ADD_BATCH):
+        batch = vectors[i:i + ADD_BATCH]
+        ids = [str(j) for j in range(i, i + len(batch))]
+        store._add_sync(batch, [{"i": j} for j in range(i, i + len(batch))], ids)
+    build_s = time.perf_counter() - start
+
+    samples, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = store._query_sync(query, k)
+        samples.append((time.perf_counter() - start) * 1000)
+        hits += len(expected & {meta["i"] for meta in results})
+
+    stats = percentiles(samples)
+    stats.update(store.stats()[""])
+    stats["build_s"] = build_s
+    stats["recall"] = hits / (k * len(queries))
+    return stats
+
+
+def main(args) -> Dict[str, Dict[str, float]]:
+    rng = np.random.default_rng(args.seed)
+    centres = rng.normal(size=(args.clusters, args.dimension)).astype(np.float32)
+    vectors = clustered_vectors(args.vectors, centres, rng)
+    queries = clustered_vectors(args.queries, centres, rng)
+    truth = exact_top_k(vectors, queries, args.k)
+
+    results = {}
+    print(HEADER.replace("(ms)", f"(ms per query)   B/vector   recall@{args.k}   build s"))
+    for compression in args.modes:
+        stats = results[compression] = run_mode(compression, vectors, queries, truth, args.k)
+        print(format_row(compression, stats)
+              + f"{stats['ram_bytes_per_vector']:>20.1f}{stats['recall']:>11.3f}{stats['build_s']:>10.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--modes", nargs="+", choices=COMPRESSIONS, default=list(COMPRESSIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
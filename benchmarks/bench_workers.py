@@ -0,0 +1,128 @@
+"""
+Memory and throughput of the pre-fork server for different worker counts.
+
+For each worker count this starts ``python server.py``, waits until it is
+healthy, drives /rag/chat with concurrent clients for --duration seconds,
+then reports RSS and PSS (proportional set size, which splits shared pages
+between the processes sharing them) for the master and every worker.
+Memory figures come from /proc and need Linux. With --embedder stub the
+server embeds with benchmarks.fakes.StubEmbedder instead of loading
+all-MiniLM-L6-v2, for machines without the model (memory then excludes it).
+
+    python -m benchmarks.bench_workers --workers 1 2 4
+    VECTOR_STORE_BACKEND=local CHAT_MEMORY_BACKEND=memory python -m benchmarks.bench_workers --embedder stub
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+sys.path.append('.')
+
+import httpx
+
+from benchmarks.common import percentiles
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """RSS and PSS of one process in kB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def child_pids(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+async def wait_healthy(base_url: str, timeout: float = 300):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError("server did not become healthy")
+
+
+async def drive(base_url: str, concurrency: int, duration: float) -> Dict[str, float]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        spec = (await client.get("/openapi.json")).json()
+        chat_path = next(path for path, ops in spec["paths"].items()
+                         if ops.get("post", {}).get("operationId", "").startswith("chat_with_rag"))
+        samples, errors = [], 0
+        deadline = time.monotonic() + duration
+
+        async def worker(n: int):
+            nonlocal errors
+            i = 0
+            while time.monotonic() < deadline:
+                begin = time.perf_counter()
+                response = await client.post(chat_path, json={"message": f"question {n}-{i}", "session_id": f"w{n}"})
+                samples.append((time.perf_counter() - begin) * 1000)
+                errors += response.status_code != 200
+                i += 1
+
+        begin = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        stats = percentiles(samples)
+        stats["req_per_s"] = len(samples) / (time.perf_counter() - begin)
+        stats["errors"] = errors
+        return stats
+
+
+# Starts server.run() with the stub embedder installed before the app is loaded
+STUB_SERVER = (
+    "import sys, server, services.embeddings as e; from benchmarks.fakes import StubEmbedder; "
+    "e._model = StubEmbedder(); server.run(host='127.0.0.1', port=int(sys.argv[2]), workers=int(sys.argv[1]))"
+)
+
+
+async def measure(workers: int, port: int, concurrency: int, duration: float, embedder: str = "minilm"):
+    base_url = f"http://127.0.0.1:{port}"
+    if embedder == "stub":
+        command = [sys.executable, "-c", STUB_SERVER, str(workers), str(port)]
+    else:
+        command = [sys.executable, "server.py", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        await wait_healthy(base_url)
+        stats = await drive(base_url, concurrency, duration)
+        master = memory_kb(server.pid)
+        worker_memory = [memory_kb(pid) for pid in child_pids(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    total_pss = master["pss"] + sum(m["pss"] for m in worker_memory)
+    print(f"\nworkers={workers}: {stats['req_per_s']:.1f} req/s, p50 {stats['p50_ms']:.1f} ms, "
+          f"p95 {stats['p95_ms']:.1f} ms, errors {stats['errors']}")
+    print(f"  master   RSS {master['rss'] / 1024:8.1f} MB  PSS {master['pss'] / 1024:8.1f} MB")
+    for i, m in enumerate(worker_memory):
+        print(f"  worker{i:<2} RSS {m['rss'] / 1024:8.1f} MB  PSS {m['pss'] / 1024:8.1f} MB")
+    print(f"  total PSS {total_pss / 1024:.1f} MB")
+
+
+async def main(args):
+    for workers in args.workers:
+        await measure(workers, args.port, args.concurrency, args.duration, args.embedder)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--embedder", choices=("minilm", "stub"), default="minilm")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,28 @@
+"""Helpers shared by the benchmark scripts"""
+import statistics
+from typing import List, Dict
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 and mean of latency samples (milliseconds)"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    return {
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def format_row(name: str, stats: Dict[str, float]) -> str:
+    """One aligned table row of latency stats"""
+    return f"{name:<14}" + "".join(f"{stats[k]:>10.3f}" for k in ("mean_ms", "p50_ms", "p95_ms", "p99_ms"))
+
+
+HEADER = f"{'':<14}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}   (ms)"
@@ -0,0 +1,90 @@
+"""Offline stand-ins used by the benchmark suite"""
+import re
+import time
+import zlib
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from services.filters import matches
+
+_TOKEN = re.compile(r"\w+")
+
+
+class StubEmbedder:
+    """Deterministic hashed bag-of-words embedder with the SentenceTransformer encode() API.
+
+    Texts sharing words get similar vectors, so retrieval still behaves
+    sensibly, and results are identical from run to run.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        out = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN.findall(text.lower()):
+                h = zlib.crc32(token.encode("utf-8"))
+                out[row, h % self.dimension] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1, norms)
+
+
+class FakePineconeIndex:
+    """In-memory stand-in for pinecone.Index (upsert/query/delete with namespaces and metadata filters).
+
+    latency_ms adds a fixed sleep per call to approximate the network round-trip.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self._namespaces: Dict[str, Dict[str, Any]] = {}
+        # namespace -> (items, matrix), rebuilt after writes
+        self._matrices: Dict[str, Any] = {}
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: Optional[str] = None, **kwargs):
+        self._wait()
+        items = self._namespaces.setdefault(namespace or "", {})
+        for item in vectors:
+            items[item["id"]] = item
+        self._matrices.pop(namespace or "", None)
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector: List[float], top_k: int = 10, include_metadata: bool = False,
+              namespace: Optional[str] = None, filter: Optional[Dict[str, Any]] = None, **kwargs):
+        self._wait()
+        items, matrix = self._matrix(namespace or "")
+        if filter:
+            rows = [i for i, item in enumerate(items) if matches(item.get("metadata", {}), filter)]
+            items, matrix = [items[i] for i in rows], matrix[rows]
+        if not items:
+            return {"matches": []}
+        query = np.asarray(vector, dtype=np.float32)
+        scores = matrix @ query / ((np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)) + 1e-12)
+        order = np.argsort(-scores)[:top_k]
+        return {
+            "matches": [
+                {"id": items[i]["id"], "score": float(scores[i]),
+                 "metadata": items[i].get("metadata", {}) if include_metadata else {}}
+                for i in order
+            ]
+        }
+
+    def delete(self, ids: Optional[List[str]] = None, namespace: Optional[str] = None, **kwargs):
+        self._wait()
+        items = self._namespaces.get(namespace or "", {})
+        for vector_id in ids or []:
+            items.pop(vector_id, None)
+        self._matrices.pop(namespace or "", None)
+
+    def _matrix(self, namespace: str):
+        if namespace not in self._matrices:
+            items = list(self._namespaces.get(namespace, {}).values())
+            matrix = np.asarray([item["values"] for item in items], dtype=np.float32)
+            self._matrices[namespace] = (items, matrix)
+        return self._matrices[namespace]
@@ -0,0 +1,84 @@
+"""
+Concurrent booking load test.
+
+Phase 1 fires --concurrency bookings at the same slot; exactly one must
+succeed and the rest must be rejected as conflicts. Phase 2 books distinct
+slots concurrently to measure throughput, then times the availability query.
+
+Runs against a fresh temporary SQLite file unless --database-url is given.
+
+    python -m benchmarks.load_bookings --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.append('.')
+
+
+async def main(concurrency: int):
+    # Imported here so DATABASE_URL is set before the engine is created
+    from benchmarks.common import HEADER, format_row, percentiles
+    from database import AsyncSessionLocal, engine, init_db
+    from services.scheduling import SlotUnavailableError, book_slot, get_availability, iter_slot_starts
+
+    await init_db()
+    # Next Monday, so every slot is bookable and in the future
+    start_day = date.today() + timedelta(days=7 - date.today().weekday())
+
+    async def attempt(i: int, slot_start: datetime, outcome: dict, latencies: list):
+        begin = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as session:
+                await book_slot(session, f"Candidate {i}", f"c{i}@example.com", slot_start)
+            outcome["booked"] += 1
+        except SlotUnavailableError:
+            outcome["conflict"] += 1
+        except Exception as e:
+            outcome.setdefault(type(e).__name__, 0)
+            outcome[type(e).__name__] += 1
+        latencies.append((time.perf_counter() - begin) * 1000)
+
+    # Phase 1: everyone races for the same slot
+    slot = next(iter_slot_starts(start_day, start_day))
+    outcome, same_slot = {"booked": 0, "conflict": 0}, []
+    await asyncio.gather(*(attempt(i, slot, outcome, same_slot) for i in range(concurrency)))
+    verdict = "✅" if outcome["booked"] == 1 and outcome["conflict"] == concurrency - 1 else "❌"
+    print(f"{verdict} same slot x{concurrency}: {outcome}")
+
+    # Phase 2: distinct slots (the first slot is already taken)
+    end_day = start_day + timedelta(days=27)
+    slots = list(iter_slot_starts(start_day, end_day))[1:concurrency + 1]
+    outcome, distinct = {"booked": 0, "conflict": 0}, []
+    begin = time.perf_counter()
+    await asyncio.gather(*(attempt(i, s, outcome, distinct) for i, s in enumerate(slots)))
+    elapsed = time.perf_counter() - begin
+    print(f"distinct slots x{len(slots)}: {outcome} in {elapsed:.2f}s ({len(slots) / elapsed:.0f}/s)")
+
+    availability = []
+    for _ in range(50):
+        begin = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            await get_availability(session, start_day, end_day)
+        availability.append((time.perf_counter() - begin) * 1000)
+    await engine.dispose()
+
+    print(HEADER)
+    print(format_row("same slot", percentiles(same_slot)))
+    print(format_row("distinct", percentiles(distinct)))
+    print(format_row("availability", percentiles(availability)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url or (
+        "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bookings.db")
+    )
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,85 @@
+"""
+Concurrent write load test: interview bookings and document uploads
+committing against the same database.
+
+Runs against a fresh temporary SQLite file unless --database-url is given.
+
+    python -m benchmarks.load_db_writes --concurrency 32 --writes 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append('.')
+
+
+async def main(concurrency: int, writes: int):
+    # Imported here so DATABASE_URL is set before the engine is created
+    from benchmarks.common import HEADER, format_row, percentiles
+    from database import AsyncSessionLocal, engine, init_db, start_query_tracking
+    from models import Document, InterviewBooking
+
+    await init_db()
+    latencies = {"booking": [], "upload": []}
+    errors = []
+    queue = asyncio.Queue()
+    for i in range(writes):
+        queue.put_nowait(i)
+
+    async def write_booking(session, i):
+        session.add(InterviewBooking(name=f"Candidate {i}", email=f"c{i}@example.com", date="2025-01-01", time="10:00"))
+
+    async def write_upload(session, i):
+        session.add(Document(
+            filename=f"doc_{i}.txt",
+            file_size=1024,
+            text_length=1000,
+            num_chunks=3,
+            chunk_strategy="paragraph",
+            chunk_size=1000,
+            document_metadata={"original_filename": f"doc_{i}.txt", "content_preview": "x" * 200},
+        ))
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            kind = "booking" if i % 2 else "upload"
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as session:
+                    await (write_booking if kind == "booking" else write_upload)(session, i)
+                    await session.commit()
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            latencies[kind].append((time.perf_counter() - start) * 1000)
+
+    stats = start_query_tracking()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+
+    done = sum(len(v) for v in latencies.values())
+    print(f"{done} commits in {elapsed:.2f}s ({done / elapsed:.0f}/s), "
+          f"concurrency={concurrency}, statements={stats.count}, errors={len(errors)}")
+    print(HEADER)
+    for kind, samples in latencies.items():
+        print(format_row(kind, percentiles(samples)))
+    for message in sorted(set(errors))[:5]:
+        print(f"❌ {message}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url or (
+        "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "load.db")
+    )
+    asyncio.run(main(args.concurrency, args.writes))
@@ -0,0 +1,281 @@
+"""
+Offline end-to-end benchmark suite.
+
+Pinecone is replaced by benchmarks.fakes.FakePineconeIndex, Redis by the
+in-process chat memory (or fakeredis with --chat-memory redis) and the
+embedding model by a deterministic stub; the real all-MiniLM-L6-v2 is
+benchmarked too when sentence-transformers is installed.
+
+Measures chunking throughput, embedding throughput per batch size, vector
+upsert/query latency and /ingest/upload and /rag/chat latency under
+concurrency. Results are written as JSON; pass --baseline to compare with
+an earlier run (exit code 1 when a metric regresses beyond --threshold).
+
+    python -m benchmarks.run_suite
+    python -m benchmarks.run_suite --baseline benchmarks/results/<earlier>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+sys.path.append('.')
+
+from benchmarks.common import percentiles
+from benchmarks.fakes import FakePineconeIndex, StubEmbedder
+
+WORDS = (
+    "model vector index query document chunk embedding latency throughput memory "
+    "retrieval context session interview booking upload paragraph token cache "
+    "database schedule metric python service network storage search answer"
+).split()
+
+
+def synthetic_text(n_chars: int, seed: int = 0) -> str:
+    """Deterministic paragraphs of pseudo-sentences, about n_chars long"""
+    rng = random.Random(seed)
+    paragraphs, total = [], 0
+    while total < n_chars:
+        sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))).capitalize() + "."
+                     for _ in range(rng.randint(2, 6))]
+        paragraph = "\n".join(sentences) if rng.random() < 0.3 else " ".join(sentences)
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:n_chars]
+
+
+def latency_metrics(prefix: str, samples: List[float], elapsed: Optional[float] = None) -> Dict[str, float]:
+    metrics = {f"{prefix}.{k}": round(v, 4) for k, v in percentiles(samples).items()}
+    if elapsed:
+        metrics[f"{prefix}.req_per_s"] = round(len(samples) / elapsed, 2)
+    return metrics
+
+
+def bench_chunking(n_chars: int) -> Dict[str, float]:
+    from services.chunker import chunk_by_paragraphs, chunk_by_size, iter_chunks_by_paragraphs, iter_chunks_by_size
+
+    text = synthetic_text(n_chars, seed=1)
+    mb = len(text.encode("utf-8")) / 1e6
+    # The streaming chunkers get the text in 1 MiB pieces, as uploads do
+    pieces = [text[i:i + 1024 * 1024] for i in range(0, len(text), 1024 * 1024)]
+    metrics = {}
+    for name, fn in (("paragraph", lambda: chunk_by_paragraphs(text)),
+                     ("fixed", lambda: chunk_by_size(text, size=1000)),
+                     ("paragraph_stream", lambda: list(iter_chunks_by_paragraphs(pieces))),
+                     ("fixed_stream", lambda: list(iter_chunks_by_size(pieces, size=1000)))):
+        start = time.perf_counter()
+        chunks = fn()
+        elapsed = time.perf_counter() - start
+        metrics[f"chunking.{name}.mb_per_s"] = round(mb / elapsed, 2)
+        metrics[f"chunking.{name}.chunks"] = len(chunks)
+    return metrics
+
+
+async def bench_embeddings(embedders: Dict[str, Any], batch_sizes: List[int], n_texts: int) -> Dict[str, float]:
+    import services.embeddings as embeddings
+    from services.chunker import chunk_by_size
+
+    texts = chunk_by_size(synthetic_text(n_texts * 400, seed=2), size=400, overlap=0)[:n_texts]
+    metrics = {}
+    for name, model in embedders.items():
+        embeddings._model = model
+        await embeddings.generate_embeddings(texts[:8])  # warm-up
+        for batch_size in batch_sizes:
+            start = time.perf_counter()
+            for i in range(0, len(texts), batch_size):
+                await embeddings.generate_embeddings(texts[i:i + batch_size])
+            elapsed = time.perf_counter() - start
+            metrics[f"embedding.{name}.batch_{batch_size}.texts_per_s"] = round(len(texts) / elapsed, 2)
+    return metrics
+
+
+async def bench_vectorstores(stores: Dict[str, Any], n_vectors: int, n_queries: int, dimension: int = 384) -> Dict[str, float]:
+    rng = random.Random(3)
+    metrics = {}
+    for name, store in stores.items():
+        upserts, queries = [], []
+        for start in range(0, n_vectors, 100):
+            count = min(100, n_vectors - start)
+            vectors = [[rng.gauss(0, 1) for _ in range(dimension)] for _ in range(count)]
+            metadata = [{"filename": f"doc_{(start + i) // 10}.txt", "chunk_index": i, "content": "x"} for i in range(count)]
+            ids = [f"{name}-{start + i}" for i in range(count)]
+            begin = time.perf_counter()
+            await store.add_vectors(vectors, metadata, ids)
+            upserts.append((time.perf_counter() - begin) * 1000)
+        filtered = []
+        for _ in range(n_queries):
+            vector = [rng.gauss(0, 1) for _ in range(dimension)]
+            begin = time.perf_counter()
+            await store.query(vector, top_k=3)
+            queries.append((time.perf_counter() - begin) * 1000)
+            # One file's chunks (10 vectors) out of the whole corpus
+            begin = time.perf_counter()
+            await store.query(vector, top_k=3, filter={"filename": {"$eq": "doc_0.txt"}})
+            filtered.append((time.perf_counter() - begin) * 1000)
+        metrics.update(latency_metrics(f"vectorstore.{name}.upsert_100", upserts))
+        metrics.update(latency_metrics(f"vectorstore.{name}.query", queries))
+        metrics.update(latency_metrics(f"vectorstore.{name}.query_filtered", filtered))
+    return metrics
+
+
+async def bench_endpoints(concurrency: int, uploads: int, chats: int, upload_chars: int) -> Dict[str, float]:
+    import httpx
+    from chat_memory import chat_memory
+    from database import init_db
+    from main import app
+
+    await init_db()
+    await chat_memory.connect()
+    upload_path = app.url_path_for("upload_document")
+    chat_path = app.url_path_for("chat_with_rag")
+    metrics = {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        async def run(label: str, total: int, make_request):
+            queue = asyncio.Queue()
+            for i in range(total):
+                queue.put_nowait(i)
+            samples, failures = [], 0
+
+            async def worker():
+                nonlocal failures
+                while not queue.empty():
+                    i = queue.get_nowait()
+                    begin = time.perf_counter()
+                    response = await make_request(i)
+                    samples.append((time.perf_counter() - begin) * 1000)
+                    if response.status_code != 200:
+                        failures += 1
+
+            begin = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            metrics.update(latency_metrics(f"e2e.{label}", samples, time.perf_counter() - begin))
+            metrics[f"e2e.{label}.errors"] = failures
+
+        await run("upload", uploads, lambda i: client.post(
+            upload_path,
+            files={"file": (f"bench_{i}.txt", synthetic_text(upload_chars, seed=100 + i).encode("utf-8"), "text/plain")},
+            data={"chunk_strategy": "paragraph"},
+        ))
+        await run("chat", chats, lambda i: client.post(
+            chat_path,
+            json={"message": f"What does the {WORDS[i % len(WORDS)]} {WORDS[(i * 7) % len(WORDS)]} do?",
+                  "session_id": f"bench-{i % concurrency}"},
+        ))
+    await chat_memory.disconnect()
+    return metrics
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Print per-metric changes and return the names of regressed metrics"""
+    regressions = []
+    print(f"\n{'metric':<52}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name in sorted(set(current) & set(baseline)):
+        old, new = baseline[name], current[name]
+        if name.endswith("_ms"):
+            lower_is_better = True
+        elif name.endswith("_per_s"):
+            lower_is_better = False
+        else:
+            continue
+        change = (new - old) / old if old else 0.0
+        regressed = (change > threshold) if lower_is_better else (change < -threshold)
+        flag = " ❌" if regressed else ""
+        print(f"{name:<52}{old:>12.3f}{new:>12.3f}{change:>+9.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+async def main(args) -> int:
+    import services.embeddings as embeddings
+    from services.vectorstore_local import LocalVectorStore
+    from services.vectorstore_pinecone import PineconeVectorStore
+
+    # Offline stand-ins must be in place before the app modules are imported
+    PineconeVectorStore._index = FakePineconeIndex(latency_ms=args.pinecone_latency_ms)
+    embedders = {"stub": StubEmbedder()}
+    try:
+        embedders["minilm"] = embeddings._get_model()
+    except Exception as e:
+        print(f"⚠️  all-MiniLM-L6-v2 unavailable ({e}), benchmarking the stub embedder only")
+    if args.chat_memory == "redis":
+        import fakeredis
+        from chat_memory import chat_memory
+        chat_memory.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    metrics = {}
+    print("🔍 chunking...")
+    metrics.update(bench_chunking(args.chunk_chars))
+    print("🔍 embeddings...")
+    metrics.update(await bench_embeddings(embedders, args.batch_sizes, args.embed_texts))
+    print("🔍 vector stores...")
+    metrics.update(await bench_vectorstores(
+        {"pinecone_fake": PineconeVectorStore(), "local": LocalVectorStore()}, args.vectors, args.queries
+    ))
+    print("🔍 endpoints...")
+    embeddings._model = embedders.get(args.embedder, embedders["stub"])
+    metrics.update(await bench_endpoints(args.concurrency, args.uploads, args.chats, args.upload_chars))
+
+    for name in sorted(metrics):
+        print(f"{name:<52}{metrics[name]:>12}")
+
+    result = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "embedders": list(embedders),
+            "e2e_embedder": args.embedder if args.embedder in embedders else "stub",
+            "args": {k: v for k, v in vars(args).items() if k not in ("baseline", "output")},
+        },
+        "metrics": metrics,
+    }
+    output = args.output or os.path.join(
+        "benchmarks", "results", datetime.utcnow().strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\n✅ Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["metrics"]
+        regressions = compare(metrics, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} metrics regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="JSON result path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier JSON result to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    parser.add_argument("--embedder", choices=("stub", "minilm"), default="stub", help="embedder for the endpoint runs")
+    parser.add_argument("--chat-memory", choices=("memory", "redis"), default="memory")
+    parser.add_argument("--pinecone-latency-ms", type=float, default=0.0, help="simulated round-trip per Pinecone call")
+    parser.add_argument("--chunk-chars", type=int, default=5_000_000)
+    parser.add_argument("--embed-texts", type=int, default=256)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--uploads", type=int, default=100)
+    parser.add_argument("--chats", type=int, default=300)
+    parser.add_argument("--upload-chars", type=int, default=20_000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+    os.environ["CHAT_MEMORY_BACKEND"] = "redis" if args.chat_memory == "redis" else "memory"
+    os.environ["VECTOR_STORE_BACKEND"] = "pinecone"
+    sys.exit(asyncio.run(main(args)))
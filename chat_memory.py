@@ -0,0 +1,32 @@
+# chat_memory.py
+import os
+
+from chat_memory_base import ChatMemory
+
+# "redis" (default), "memory" (in-process) or "sqlite"
+CHAT_MEMORY_BACKEND = os.getenv("CHAT_MEMORY_BACKEND", "redis")
+
+
+def create_chat_memory(backend: str = CHAT_MEMORY_BACKEND) -> ChatMemory:
+    """Create the chat memory backend selected by name"""
+    backend = backend.lower()
+    if backend == "redis":
+        from redis_memory import RedisChatMemory
+        return RedisChatMemory()
+    if backend == "memory":
+        from local_memory import InMemoryChatMemory
+        return InMemoryChatMemory()
+    if backend == "sqlite":
+        from local_memory import SQLiteChatMemory
+        return SQLiteChatMemory()
+    raise ValueError(f"Unknown chat memory backend: {backend}. Use 'redis', 'memory' or 'sqlite'")
+
+
+# Global instance shared by all requests
+chat_memory = create_chat_memory()
+
+
+async def get_chat_memory() -> ChatMemory:
+    """FastAPI dependency returning the shared chat memory"""
+    await chat_memory.connect()
+    return chat_memory
@@ -0,0 +1,42 @@
+# chat_memory_base.py
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Dict, Any
+import os
+
+# Number of messages kept per session (older ones are trimmed on write)
+MAX_MESSAGES = int(os.getenv("CHAT_MEMORY_MAX_MESSAGES", "20"))
+
+
+def make_message(role: str, content: str) -> Dict[str, Any]:
+    """Build a chat message record in the format shared by all backends"""
+    return {"role": role, "content": content, "timestamp": str(datetime.utcnow())}
+
+
+class ChatMemory(ABC):
+    """Per-session chat history store.
+
+    Every backend keeps at most ``max_messages`` per session and returns the
+    newest ``limit`` messages oldest-first, matching Redis ``LTRIM``/``LRANGE``.
+    """
+
+    def __init__(self, max_messages: int = MAX_MESSAGES):
+        self.max_messages = max_messages
+
+    async def connect(self):
+        """Open any underlying connection (no-op by default)"""
+
+    async def disconnect(self):
+        """Close any underlying connection (no-op by default)"""
+
+    @abstractmethod
+    async def add_message(self, session_id: str, role: str, content: str):
+        pass
+
+    @abstractmethod
+    async def get_messages(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def clear_messages(self, session_id: str):
+        pass
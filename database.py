@@ -1,20 +1,101 @@
-from sqlalchemy import create_engine
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional
+import logging
 import os
-from typing import AsyncGenerator
+import random
+import time
 
 # SQLite for simplicity (you can change to PostgreSQL/MySQL later)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./backend.db")
 
+# Engine settings (pool settings apply to server databases such as PostgreSQL)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# Fraction of statements written to the "database.sql" debug logger
+DB_SQL_LOG_SAMPLE_RATE = float(os.getenv("DB_SQL_LOG_SAMPLE_RATE", "0.01"))
+
+sql_logger = logging.getLogger("database.sql")
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+
+def _engine_options() -> dict:
+    options = {"echo": DB_ECHO, "pool_pre_ping": not IS_SQLITE}
+    if IS_SQLITE:
+        # sqlite3's own busy handler, in seconds
+        options["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    else:
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+
 # Async engine and session
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, **_engine_options())
 AsyncSessionLocal = sessionmaker(
     engine, 
     class_=AsyncSession, 
     expire_on_commit=False
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers proceed while a writer commits; NORMAL sync is safe under WAL"""
+    if not IS_SQLITE:
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed while handling one request"""
+    count: int = 0
+    duration_ms: float = 0.0
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_tracking() -> QueryStats:
+    """Start counting statements for the current request and return the counter"""
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration_ms += elapsed_ms
+    if random.random() < DB_SQL_LOG_SAMPLE_RATE and sql_logger.isEnabledFor(logging.DEBUG):
+        sql_logger.debug("%.2f ms %s", elapsed_ms, statement)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
@@ -26,4 +107,37 @@ async def init_db():
     """Initialize database tables"""
     from models import Base
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        new_tables = await conn.run_sync(_missing_tables, Base.metadata)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns, Base.metadata)
+        await conn.run_sync(_create_missing_indexes, Base.metadata)
+        if "tenant_usage" in new_tables:
+            from services.tenants import seed_usage
+            await conn.run_sync(seed_usage)
+
+
+def _missing_tables(sync_conn, metadata):
+    from sqlalchemy import inspect
+    existing = set(inspect(sync_conn).get_table_names())
+    return {table.name for table in metadata.sorted_tables if table.name not in existing}
+
+
+def _add_missing_columns(sync_conn, metadata):
+    """Add nullable (or server-defaulted) columns introduced since the tables were created"""
+    from sqlalchemy import inspect
+    from sqlalchemy.schema import CreateColumn
+
+    inspector = inspect(sync_conn)
+    for table in metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and (column.nullable or column.server_default is not None):
+                ddl = CreateColumn(column).compile(dialect=sync_conn.dialect)
+                sync_conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+
+
+def _create_missing_indexes(sync_conn, metadata):
+    """create_all skips existing tables, so add indexes introduced since they were created"""
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
@@ -0,0 +1,136 @@
+# local_memory.py
+import asyncio
+import json
+import os
+from collections import OrderedDict, deque
+from typing import List, Dict, Any, Deque
+
+import aiosqlite
+
+from chat_memory_base import ChatMemory, MAX_MESSAGES, make_message
+
+MAX_SESSIONS = int(os.getenv("CHAT_MEMORY_MAX_SESSIONS", "10000"))
+SQLITE_PATH = os.getenv("CHAT_MEMORY_SQLITE_PATH", "./chat_memory.db")
+
+
+def _tail(messages: List[Any], limit: int) -> List[Any]:
+    # Same semantics as LRANGE key -limit -1 (limit=0 returns everything)
+    return messages[-limit:]
+
+
+class InMemoryChatMemory(ChatMemory):
+    """In-process chat memory.
+
+    Each session is a ring buffer of ``max_messages``; once ``max_sessions``
+    sessions exist the least recently used one is evicted.
+    """
+
+    def __init__(self, max_messages: int = MAX_MESSAGES, max_sessions: int = MAX_SESSIONS):
+        super().__init__(max_messages)
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+
+    async def add_message(self, session_id: str, role: str, content: str):
+        """Add a message to chat history"""
+        history = self._sessions.get(session_id)
+        if history is None:
+            history = deque(maxlen=self.max_messages)
+            self._sessions[session_id] = history
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        history.append(make_message(role, content))
+
+    async def get_messages(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get chat history for session"""
+        history = self._sessions.get(session_id)
+        if history is None:
+            return []
+        self._sessions.move_to_end(session_id)
+        return [dict(msg) for msg in _tail(list(history), limit)]
+
+    async def clear_messages(self, session_id: str):
+        """Clear chat history for session"""
+        self._sessions.pop(session_id, None)
+
+
+class SQLiteChatMemory(ChatMemory):
+    """Chat memory persisted in a local SQLite file running in WAL mode"""
+
+    def __init__(self, path: str = SQLITE_PATH, max_messages: int = MAX_MESSAGES):
+        super().__init__(max_messages)
+        self.path = path
+        self.conn = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        """Open the database and create the messages table"""
+        if self.conn:
+            return
+        async with self._lock:
+            if self.conn:
+                return
+            conn = await aiosqlite.connect(self.path)
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.execute("PRAGMA synchronous=NORMAL")
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_messages ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " session_id TEXT NOT NULL,"
+                " message TEXT NOT NULL)"
+            )
+            await conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_chat_messages_session "
+                "ON chat_messages (session_id, id)"
+            )
+            await conn.commit()
+            self.conn = conn
+
+    async def disconnect(self):
+        """Close the database"""
+        if self.conn:
+            await self.conn.close()
+            self.conn = None
+
+    async def add_message(self, session_id: str, role: str, content: str):
+        """Add a message to chat history"""
+        await self.connect()
+        message = make_message(role, content)
+        await self.conn.execute(
+            "INSERT INTO chat_messages (session_id, message) VALUES (?, ?)",
+            (session_id, json.dumps(message)),
+        )
+        # Keep only the last N messages for this session
+        await self.conn.execute(
+            "DELETE FROM chat_messages WHERE session_id = ? AND id <= ("
+            " SELECT id FROM chat_messages WHERE session_id = ?"
+            " ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (session_id, session_id, self.max_messages),
+        )
+        await self.conn.commit()
+
+    async def get_messages(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get chat history for session"""
+        await self.connect()
+        if limit > 0:
+            cursor = await self.conn.execute(
+                "SELECT message FROM chat_messages WHERE session_id = ?"
+                " ORDER BY id DESC LIMIT ?",
+                (session_id, limit),
+            )
+            rows = list(reversed(await cursor.fetchall()))
+        else:
+            cursor = await self.conn.execute(
+                "SELECT message FROM chat_messages WHERE session_id = ? ORDER BY id",
+                (session_id,),
+            )
+            rows = _tail(await cursor.fetchall(), limit)
+        await cursor.close()
+        return [json.loads(row[0]) for row in rows]
+
+    async def clear_messages(self, session_id: str):
+        """Clear chat history for session"""
+        await self.connect()
+        await self.conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+        await self.conn.commit()
@@ -1,28 +1,131 @@
 # main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from routers.ingest import router as ingest_router
 from routers.rag import router as rag_router
-from database import init_db
-from redis_memory import chat_memory
+from routers.admin import router as admin_router, is_admin_token
+from database import init_db, start_query_tracking
+from chat_memory import chat_memory
+from services.vectorstore import close_vectorstore, get_vectorstore
+from services.profiling import RequestProfiler, should_sample
+from services.admission import BULK, INTERACTIVE, Overloaded, controllers, set_lane
+from services.uploads import UPLOAD_MAX_BYTES
+from services.metrics import (
+    REQUEST_DURATION, REQUESTS_IN_FLIGHT, render_metrics, server_timing_header, start_request_timings
+)
 import asyncio
+import os
+import time
 
 app = FastAPI(title="Backend AIML")
 
 # Include routers
 app.include_router(ingest_router, prefix="/ingest", tags=["ingest"])
 app.include_router(rag_router, prefix="/rag", tags=["rag"])
+app.include_router(admin_router, prefix="/admin", tags=["admin"])
+
+# Hot-path POST requests, matched on the end of the URL path
+CHAT_PATH_SUFFIXES = ("/chat",)
+INGEST_PATH_SUFFIXES = ("/upload", "/upload/bulk")
+PROFILED_PATH_SUFFIXES = CHAT_PATH_SUFFIXES + INGEST_PATH_SUFFIXES
+
+# Whole upload request (bulk uploads carry several files)
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(4 * UPLOAD_MAX_BYTES)))
+
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    """Expose per-request SQL statement count and time as response headers"""
+    stats = start_query_tracking()
+    response = await call_next(request)
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+    response.headers["X-DB-Query-Time-Ms"] = f"{stats.duration_ms:.2f}"
+    return response
+
+@app.middleware("http")
+async def profiling_middleware(request: Request, call_next):
+    """Profile sampled, admin-requested (X-Profile: 1) or slow hot-path requests"""
+    if request.method != "POST" or not request.url.path.endswith(PROFILED_PATH_SUFFIXES):
+        return await call_next(request)
+
+    forced = request.headers.get("X-Profile") == "1" and is_admin_token(request.headers.get("X-Admin-Token"))
+    profiler = RequestProfiler(request.url.path.strip("/").replace("/", "_"), should_sample(forced))
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        profile_name = await profiler.finish((time.perf_counter() - start) * 1000)
+    if profile_name:
+        response.headers["X-Profile-Id"] = profile_name
+    return response
+
+@app.middleware("http")
+async def admission_middleware(request: Request, call_next):
+    """Limit concurrent chat/ingest requests, shed load when queues are full, pick the work lane"""
+    if request.method != "POST":
+        return await call_next(request)
+    if request.url.path.endswith(CHAT_PATH_SUFFIXES):
+        controller, lane = controllers["chat"], INTERACTIVE
+    elif request.url.path.endswith(INGEST_PATH_SUFFIXES):
+        controller, lane = controllers["ingest"], BULK
+        # Refuse oversized bodies before anything is read
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > UPLOAD_MAX_REQUEST_BYTES:
+            return JSONResponse(status_code=413, content={"detail": "Request body too large"})
+    else:
+        return await call_next(request)
+
+    set_lane(lane)
+    try:
+        async with controller.admit():
+            return await call_next(request)
+    except Overloaded as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"detail": e.detail},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+# Label values for in-flight requests; any other first path segment is "other",
+# so arbitrary request paths cannot create new series
+IN_FLIGHT_PREFIXES = frozenset({"/", "/ingest", "/rag", "/admin", "/metrics", "/health"})
+
+def _path_prefix(request: Request) -> str:
+    """First path segment (e.g. /ingest) if it is a known prefix, else "other" """
+    prefix = "/" + request.url.path.lstrip("/").split("/", 1)[0]
+    return prefix if prefix in IN_FLIGHT_PREFIXES else "other"
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """Record latency per handler and in-flight requests per prefix, return stage timings"""
+    timings = start_request_timings()
+    start = time.perf_counter()
+    with REQUESTS_IN_FLIGHT.track_inprogress(prefix=_path_prefix(request)):
+        response = await call_next(request)
+    endpoint = request.scope.get("endpoint")
+    REQUEST_DURATION.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        handler=getattr(endpoint, "__name__", "unmatched"),
+        status=str(response.status_code)
+    )
+    if timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
     await init_db()
     await chat_memory.connect()
-    print("✅ Database and Redis initialized")
+    # Opened here rather than at import, so each (forked) worker opens its own
+    get_vectorstore()
+    print("✅ Database, chat memory and vector store initialized")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     await chat_memory.disconnect()
+    await close_vectorstore()
     print("✅ Services shut down gracefully")
 
 @app.get("/")
@@ -46,4 +149,9 @@ async def health_check() -> dict:
         "database": "connected",  # You can add actual checks
         "redis": "connected",
         "pinecone": "connected"
-    }
\ No newline at end of file
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus metrics"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
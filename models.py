@@ -1,16 +1,26 @@
 # models.py
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import uuid
 
+from services.tenants import DEFAULT_TENANT
+
 Base = declarative_base()
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Newest-first keyset pagination: ORDER BY uploaded_at DESC, id DESC
+        Index("ix_documents_uploaded_at_id", "uploaded_at", "id"),
+        # Per-tenant listing and usage
+        Index("ix_documents_tenant_uploaded_at_id", "tenant_id", "uploaded_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    filename = Column(String(255), nullable=False)
+    # Existing rows are assigned to the default tenant when the column is added
+    tenant_id = Column(String(64), nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
+    filename = Column(String(255), nullable=False, index=True)
     file_size = Column(Integer, nullable=False)
     text_length = Column(Integer, nullable=False)
     num_chunks = Column(Integer, nullable=False)
@@ -19,13 +29,32 @@ class Document(Base):
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     document_metadata = Column(JSON)  # Store additional metadata if needed
 
+class TenantUsageCount(Base):
+    """Running totals of a tenant's documents, kept in step with inserts and deletes"""
+    __tablename__ = "tenant_usage"
+
+    tenant_id = Column(String(64), primary_key=True)
+    documents = Column(Integer, nullable=False, default=0)
+    vectors = Column(Integer, nullable=False, default=0)
+
 class InterviewBooking(Base):
     __tablename__ = "interview_bookings"
+    __table_args__ = (
+        # One active booking per slot; also serves the availability range query
+        Index(
+            "uq_interview_bookings_active_slot",
+            "slot_start",
+            unique=True,
+            sqlite_where=text("status = 'scheduled'"),
+            postgresql_where=text("status = 'scheduled'")
+        ),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(255), nullable=False)
     email = Column(String(255), nullable=False)
     date = Column(String(50), nullable=False)  # Store as string for simplicity
     time = Column(String(50), nullable=False)
+    slot_start = Column(DateTime, nullable=True)  # Normalised date + time; null for legacy rows
     created_at = Column(DateTime, default=datetime.utcnow)
     status = Column(String(50), default="scheduled")  # scheduled, completed, cancelled
\ No newline at end of file
@@ -4,8 +4,11 @@ import json
 from typing import List, Dict, Any
 import os
 
-class RedisChatMemory:
-    def __init__(self):
+from chat_memory_base import ChatMemory, MAX_MESSAGES, make_message
+
+class RedisChatMemory(ChatMemory):
+    def __init__(self, max_messages: int = MAX_MESSAGES):
+        super().__init__(max_messages)
         self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
         self.client = None
         
@@ -18,15 +21,18 @@ class RedisChatMemory:
         """Disconnect from Redis"""
         if self.client:
             await self.client.close()
+            self.client = None
             
     async def add_message(self, session_id: str, role: str, content: str):
         """Add a message to chat history"""
         await self.connect()
-        message = {"role": role, "content": content, "timestamp": str(__import__('datetime').datetime.utcnow())}
+        message = make_message(role, content)
         key = f"chat:{session_id}"
-        await self.client.rpush(key, json.dumps(message))
-        # Keep only last 20 messages to prevent memory issues
-        await self.client.ltrim(key, -20, -1)
+        # Push and trim in one round-trip; keep only the last N messages
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, json.dumps(message))
+            pipe.ltrim(key, -self.max_messages, -1)
+            await pipe.execute()
         
     async def get_messages(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get chat history for session"""
@@ -40,6 +46,3 @@ class RedisChatMemory:
         await self.connect()
         key = f"chat:{session_id}"
         await self.client.delete(key)
-
-# Global instance
-chat_memory = RedisChatMemory()
\ No newline at end of file
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+from typing import Optional
+import os
+import secrets
+
+from services import profiling
+
+router = APIRouter()
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    expected = os.getenv("ADMIN_TOKEN")
+    return bool(expected and token and secrets.compare_digest(token, expected))
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints need the X-Admin-Token header to match ADMIN_TOKEN"""
+    if not os.getenv("ADMIN_TOKEN"):
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+class ProfilingUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = Field(None, ge=0, le=1)
+    slow_ms: Optional[float] = Field(None, ge=0)
+
+
+@router.get("/profiling", dependencies=[Depends(require_admin)])
+async def get_profiling_settings() -> dict:
+    return profiling.settings.as_dict()
+
+
+@router.post("/profiling", dependencies=[Depends(require_admin)])
+async def update_profiling_settings(update: ProfilingUpdate) -> dict:
+    """Turn sampled profiling on/off and adjust the sample rate and slow-request threshold"""
+    for field, value in update.model_dump(exclude_none=True).items():
+        setattr(profiling.settings, field, value)
+    return profiling.settings.as_dict()
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles() -> dict:
+    return {"profiles": profiling.list_profiles()}
+
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_admin)])
+async def download_profile(name: str):
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
@@ -1,92 +1,283 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
-from typing import List, Optional
-import aiofiles
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Query
+from typing import AsyncIterator, List, Optional, Dict, Any
+from pydantic import BaseModel, Field
 import os
 from sqlalchemy.ext.asyncio import AsyncSession
+from collections import OrderedDict
+from datetime import datetime
 import uuid
 
-from services.text_extractor import extract_text_from_file
-from services.chunker import chunk_by_paragraphs, chunk_by_size
+from services.text_extractor import extract_text_from_pdf
+from services.uploads import TextStream, UploadTooLarge, read_spooled_upload
+from services.chunker import create_chunker
 from services.embeddings import generate_embeddings
-from services.vectorstore_pinecone import PineconeVectorStore
+from services.vectorstore import get_vectorstore
+from services.pagination import CachedCount, decode_cursor, encode_cursor
+from services.metrics import CHUNKS_CREATED, DOCUMENTS_INGESTED, QUOTA_REJECTIONS, TOKENS, approx_tokens, stage
+from services.tenants import QuotaExceeded, add_usage, check_quota, get_tenant, get_usage, tenant_label, vector_namespace
+from services.filters import to_timestamp
 from models import Document
 from database import get_db
 
-vectorstore = PineconeVectorStore()
 router = APIRouter()
 
+# Approximate document total per tenant for listings, for the most recently
+# used DOCUMENT_COUNT_MAX_TENANTS tenants (an evicted tenant is recounted)
+DOCUMENT_COUNT_TTL = float(os.getenv("DOCUMENT_COUNT_TTL", "30"))
+DOCUMENT_COUNT_MAX_TENANTS = int(os.getenv("DOCUMENT_COUNT_MAX_TENANTS", "1024"))
+_document_counts: "OrderedDict[str, CachedCount]" = OrderedDict()
+
+# Limits for the bulk endpoints
+BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", "5000"))
+BULK_MAX_FILES = int(os.getenv("BULK_MAX_FILES", "50"))
+
+# Chunks embedded and upserted per step while a single upload is still being read
+INGEST_FLUSH_CHUNKS = int(os.getenv("INGEST_FLUSH_CHUNKS", "512"))
+
+
+
+class BulkIdsRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=BULK_MAX_IDS)
+
+
+def document_count(tenant: str) -> CachedCount:
+    counter = _document_counts.get(tenant)
+    if counter is None:
+        counter = _document_counts[tenant] = CachedCount("document_count", ttl=DOCUMENT_COUNT_TTL)
+        while len(_document_counts) > DOCUMENT_COUNT_MAX_TENANTS:
+            _document_counts.popitem(last=False)
+    else:
+        _document_counts.move_to_end(tenant)
+    return counter
+
+
+def _check_quota(tenant: str, usage, new_documents: int = 0, new_vectors: int = 0):
+    try:
+        check_quota(tenant, usage, new_documents, new_vectors)
+    except QuotaExceeded as e:
+        QUOTA_REJECTIONS.inc(tenant=tenant_label(tenant), quota=e.quota)
+        raise HTTPException(status_code=403, detail=str(e))
+
+
+def _check_extension(filename: str):
+    name = filename.lower()
+    if not (name.endswith(".pdf") or name.endswith(".txt")):
+        raise HTTPException(status_code=400, detail="Only .pdf and .txt files are supported")
+
+
+def _get_chunker(chunk_strategy: str, chunk_size: Optional[int]):
+    try:
+        return create_chunker(chunk_strategy, chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class _UploadText:
+    """What is kept of an upload's text while it streams through the chunker"""
+
+    PREVIEW_CHARS = 200
+
+    def __init__(self):
+        self.file_size = 0
+        self.sha256 = ""
+        self.text_length = 0
+        self.has_text = False
+        self._head = ""
+
+    def add(self, piece: str):
+        self.text_length += len(piece)
+        TOKENS.inc(approx_tokens(piece), kind="ingest")
+        if len(self._head) <= self.PREVIEW_CHARS:
+            self._head += piece[:self.PREVIEW_CHARS + 1 - len(self._head)]
+        if not self.has_text and piece.strip():
+            self.has_text = True
+
+    @property
+    def preview(self) -> str:
+        head = self._head
+        return head[:self.PREVIEW_CHARS] + "..." if len(head) > self.PREVIEW_CHARS else head
+
+
+def _count_chunks(chunks: List[str], tenant: str) -> List[str]:
+    CHUNKS_CREATED.inc(len(chunks), tenant=tenant_label(tenant))
+    return chunks
+
+
+async def _iter_upload_chunks(file: UploadFile, chunker, info: _UploadText, tenant: str) -> AsyncIterator[List[str]]:
+    """
+    Read the upload and yield its chunks in batches as they are produced.
+    .txt uploads are decoded and chunked piece by piece, so memory stays
+    bounded by the body chunk size rather than the file size; PDFs are
+    extracted whole from the file Starlette spooled them to. Fills in info
+    along the way.
+    """
+    try:
+        if file.filename.lower().endswith(".txt"):
+            stream = TextStream(file)
+            async for piece in stream:
+                info.add(piece)
+                with stage("chunk"):
+                    chunks = chunker.feed(piece)
+                if chunks:
+                    yield _count_chunks(chunks, tenant)
+            info.file_size, info.sha256 = stream.size, stream.sha256
+        else:
+            spooled = await read_spooled_upload(file)
+            with stage("extract"):
+                text = await extract_text_from_pdf(spooled.file)
+            info.file_size, info.sha256 = spooled.size, spooled.sha256
+            info.add(text)
+            with stage("chunk"):
+                chunks = chunker.feed(text)
+            if chunks:
+                yield _count_chunks(chunks, tenant)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    with stage("chunk"):
+        chunks = chunker.finish()
+    if chunks:
+        yield _count_chunks(chunks, tenant)
+    if not info.has_text:
+        raise HTTPException(status_code=400, detail="No text could be extracted from the file")
+
+
+def _chunk_metadata(document: Document, chunks: List[str], first_index: int = 0) -> List[Dict[str, Any]]:
+    """Vector metadata; document_id and uploaded_at_ts are what retrieval filters match on"""
+    uploaded_at_ts = to_timestamp(document.uploaded_at)
+    return [
+        {
+            "tenant_id": document.tenant_id,
+            "document_id": document.id,
+            "filename": document.filename,
+            "chunk_index": first_index + i,
+            "content": chunks[i],
+            "chunk_strategy": document.chunk_strategy,
+            "chunk_size": document.chunk_size if document.chunk_strategy == "fixed" else 0,
+            "uploaded_at_ts": uploaded_at_ts
+        }
+        for i in range(len(chunks))
+    ]
+
+
+def vector_id(document_id: str, chunk_index: int) -> str:
+    """Vector id of a document's chunk, so a document's vectors can be found again from its row"""
+    return f"{document_id}:{chunk_index}"
+
+
+async def _store_chunks(chunks: List[str], metadata_list: List[Dict[str, Any]], tenant: str) -> List[str]:
+    """Embed chunks and upsert them into the tenant's namespace; returns the vector ids"""
+    ids = [vector_id(meta["document_id"], meta["chunk_index"]) for meta in metadata_list]
+    with stage("embed"):
+        embeddings = await generate_embeddings(chunks)
+    with stage("upsert"):
+        await get_vectorstore().add_vectors(embeddings, metadata_list, ids, namespace=vector_namespace(tenant))
+    return ids
+
+
+async def _delete_document_vectors(rows, tenant: str):
+    """Remove the vectors of deleted documents (rows with id and num_chunks)"""
+    ids = [vector_id(str(row.id), i) for row in rows for i in range(row.num_chunks or 0)]
+    if ids:
+        await get_vectorstore().delete_vectors(ids, namespace=vector_namespace(tenant))
+
+
+async def _discard_vectors(ids: List[str], tenant: str):
+    """Best-effort removal of vectors stored for an upload that then failed"""
+    if not ids:
+        return
+    try:
+        await get_vectorstore().delete_vectors(ids, namespace=vector_namespace(tenant))
+    except Exception as e:
+        print(f"⚠️ Could not remove {len(ids)} vectors of a failed upload: {e}")
+
+
+def _new_document(filename: str, chunk_strategy: str, chunk_size: Optional[int], tenant: str) -> Document:
+    """Document row created before ingestion, so its id and upload time can go into vector metadata"""
+    return Document(
+        id=str(uuid.uuid4()),
+        tenant_id=tenant,
+        filename=filename,
+        chunk_strategy=chunk_strategy,
+        chunk_size=chunk_size,
+        uploaded_at=datetime.utcnow()
+    )
+
+
+def _finish_document(document: Document, info: _UploadText, num_chunks: int) -> Document:
+    document.file_size = info.file_size
+    document.text_length = info.text_length
+    document.num_chunks = num_chunks
+    document.document_metadata = {
+        "original_filename": document.filename,
+        "sha256": info.sha256,
+        "content_preview": info.preview
+    }
+    return document
+
+
+def _document_dict(document: Document) -> dict:
+    return {
+        "document_id": str(document.id),
+        "filename": document.filename,
+        "file_size": document.file_size,
+        "text_length": document.text_length,
+        "num_chunks": document.num_chunks,
+        "chunk_strategy": document.chunk_strategy,
+        "chunk_size": document.chunk_size,
+        "uploaded_at": document.uploaded_at.isoformat(),
+        "document_metadata": document.document_metadata
+    }
+
+
 @router.post("/upload")
 async def upload_document(
     file: UploadFile = File(...),
     chunk_strategy: str = Form("paragraph"),
     chunk_size: Optional[int] = Form(1000),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    tenant: str = Depends(get_tenant)
 ) -> dict:
     """
     Upload a .pdf or .txt file, extract text, chunk it, and store in vector database + SQL.
     chunk_strategy: 'paragraph' or 'fixed'
     chunk_size: integer number of characters (used for 'fixed' strategy)
+    The document belongs to the caller's tenant (X-Tenant-ID) and counts against its quotas.
     """
-    filename = file.filename.lower()
-    if not (filename.endswith(".pdf") or filename.endswith(".txt")):
-        raise HTTPException(status_code=400, detail="Only .pdf and .txt files are supported")
-
-    tmp_dir = "tmp_uploads"
-    os.makedirs(tmp_dir, exist_ok=True)
-    saved_path = os.path.join(tmp_dir, file.filename)
+    _check_extension(file.filename)
+    chunker = _get_chunker(chunk_strategy, chunk_size)
 
+    stored_ids: List[str] = []
     try:
-        # Save uploaded file
-        async with aiofiles.open(saved_path, "wb") as out_file:
-            content = await file.read()
-            await out_file.write(content)
-            file_size = len(content)
-
-        # Extract text
-        text = await extract_text_from_file(saved_path)
-        if not text.strip():
-            raise HTTPException(status_code=400, detail="No text could be extracted from the file")
-
-        # Chunking
-        if chunk_strategy == "paragraph":
-            chunks = chunk_by_paragraphs(text)
-        elif chunk_strategy == "fixed":
-            chunks = chunk_by_size(text, size=chunk_size)
-        else:
-            raise HTTPException(status_code=400, detail="Unknown chunk strategy. Use 'paragraph' or 'fixed'")
+        usage = await get_usage(db, tenant)
+        _check_quota(tenant, usage, new_documents=1)
 
-        # Store vectors in Pinecone
-        if chunks:
-            ids = [str(uuid.uuid4()) for _ in chunks]
-            embeddings = await generate_embeddings(chunks)
-            metadata_list = [
-                {
-                    "filename": file.filename,
-                    "chunk_index": i,
-                    "content": chunks[i],
-                    "chunk_strategy": chunk_strategy,
-                    "chunk_size": chunk_size if chunk_strategy == "fixed" else 0
-                }
-                for i in range(len(chunks))
-            ]
-            await vectorstore.add_vectors(embeddings, metadata_list, ids)
+        # Chunks are embedded and stored in the vector store in batches while the file is read
+        document = _new_document(file.filename, chunk_strategy, chunk_size, tenant)
+        info = _UploadText()
+        pending: List[str] = []
+
+        async def flush():
+            _check_quota(tenant, usage, new_vectors=len(stored_ids) + len(pending))
+            metadata_list = _chunk_metadata(document, pending, len(stored_ids))
+            stored_ids.extend(await _store_chunks(pending, metadata_list, tenant))
+            pending.clear()
+
+        async for chunks in _iter_upload_chunks(file, chunker, info, tenant):
+            pending.extend(chunks)
+            if len(pending) >= INGEST_FLUSH_CHUNKS:
+                await flush()
+        if pending:
+            await flush()
 
         # Store document metadata in SQL
-        document = Document(
-            filename=file.filename,
-            file_size=file_size,
-            text_length=len(text),
-            num_chunks=len(chunks),
-            chunk_strategy=chunk_strategy,
-            chunk_size=chunk_size,
-            document_metadata={
-                "original_filename": file.filename,
-                "content_preview": text[:200] + "..." if len(text) > 200 else text
-            }
-        )
+        _finish_document(document, info, len(stored_ids))
         db.add(document)
-        await db.commit()
-        await db.refresh(document)
+        await add_usage(db, tenant, 1, document.num_chunks)
+        with stage("sql_commit"):
+            await db.commit()
+        document_count(tenant).add(1)
+        DOCUMENTS_INGESTED.inc(tenant=tenant_label(tenant))
 
         return {
             "document_id": str(document.id),
@@ -101,55 +292,165 @@ async def upload_document(
         }
 
     except HTTPException:
+        await _discard_vectors(stored_ids, tenant)
         raise
     except Exception as e:
+        await _discard_vectors(stored_ids, tenant)
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing document: {str(e)}")
-    finally:
-        if os.path.exists(saved_path):
-            os.remove(saved_path)
 
 
+@router.post("/upload/bulk")
+async def upload_documents_bulk(
+    files: List[UploadFile] = File(...),
+    chunk_strategy: str = Form("paragraph"),
+    chunk_size: Optional[int] = Form(1000),
+    db: AsyncSession = Depends(get_db),
+    tenant: str = Depends(get_tenant)
+) -> dict:
+    """
+    Upload several .pdf/.txt files at once into the caller's tenant.
+    Chunks from all files are embedded together, upserted in one call and the
+    documents are committed in one transaction. Files that cannot be used are
+    reported under 'failed' and do not stop the rest of the batch.
+    """
+    if len(files) > BULK_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_FILES} files per request")
+    _get_chunker(chunk_strategy, chunk_size)
+
+    documents = []
+    all_chunks = []
+    all_metadata = []
+    failed = []
+    stored_ids: List[str] = []
+    try:
+        for file in files:
+            try:
+                _check_extension(file.filename)
+                info = _UploadText()
+                chunks = []
+                async for batch in _iter_upload_chunks(file, _get_chunker(chunk_strategy, chunk_size), info, tenant):
+                    chunks.extend(batch)
+            except HTTPException as e:
+                failed.append({"filename": file.filename, "detail": e.detail})
+                continue
+            document = _finish_document(_new_document(file.filename, chunk_strategy, chunk_size, tenant), info, len(chunks))
+            documents.append(document)
+            all_chunks.extend(chunks)
+            all_metadata.extend(_chunk_metadata(document, chunks))
+
+        if documents:
+            _check_quota(tenant, await get_usage(db, tenant), len(documents), len(all_chunks))
+
+        # One embedding pass and one upsert across every file in the batch
+        if all_chunks:
+            stored_ids = await _store_chunks(all_chunks, all_metadata, tenant)
+
+        if documents:
+            db.add_all(documents)
+            await add_usage(db, tenant, len(documents), len(all_chunks))
+            with stage("sql_commit"):
+                await db.commit()
+            document_count(tenant).add(len(documents))
+            DOCUMENTS_INGESTED.inc(len(documents), tenant=tenant_label(tenant))
+
+        return {
+            "documents": [
+                {
+                    "document_id": str(document.id),
+                    "filename": document.filename,
+                    "file_size": document.file_size,
+                    "text_length": document.text_length,
+                    "num_chunks": document.num_chunks
+                }
+                for document in documents
+            ],
+            "failed": failed,
+            "total_chunks": len(all_chunks),
+            "message": f"{len(documents)} documents successfully processed and stored"
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        await _discard_vectors(stored_ids, tenant)
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error processing documents: {str(e)}")
+
+
+# Columns returned by the listing; document_metadata is left out on purpose
+LIST_COLUMNS = (
+    Document.id,
+    Document.filename,
+    Document.file_size,
+    Document.text_length,
+    Document.num_chunks,
+    Document.chunk_strategy,
+    Document.chunk_size,
+    Document.uploaded_at,
+)
+
 @router.get("/documents")
 async def list_documents(
     db: AsyncSession = Depends(get_db),
-    skip: int = 0,
-    limit: int = 10
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    include_total: bool = False,
+    tenant: str = Depends(get_tenant)
 ) -> dict:
-    from sqlalchemy import select
+    """
+    List the caller's documents newest first.
+    cursor: value of next_cursor from the previous page (omit for the first page)
+    include_total: also return an approximate total, cached for DOCUMENT_COUNT_TTL seconds
+    """
+    from sqlalchemy import select, tuple_
     from sqlalchemy.sql import func
 
     try:
-        total_count_result = await db.execute(select(func.count(Document.id)))
-        total_count = total_count_result.scalar()
-
-        documents_result = await db.execute(
-            select(Document)
-            .order_by(Document.uploaded_at.desc())
-            .offset(skip)
-            .limit(limit)
+        query = select(*LIST_COLUMNS).where(Document.tenant_id == tenant)
+        if cursor:
+            try:
+                last_uploaded_at, last_id = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(tuple_(Document.uploaded_at, Document.id) < (last_uploaded_at, last_id))
+
+        # Fetch one extra row to know whether another page exists
+        rows_result = await db.execute(
+            query
+            .order_by(Document.uploaded_at.desc(), Document.id.desc())
+            .limit(limit + 1)
         )
-        documents = documents_result.scalars().all()
+        rows = rows_result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
-        return {
+        response = {
             "documents": [
                 {
-                    "id": str(doc.id),
-                    "filename": doc.filename,
-                    "file_size": doc.file_size,
-                    "text_length": doc.text_length,
-                    "num_chunks": doc.num_chunks,
-                    "chunk_strategy": doc.chunk_strategy,
-                    "chunk_size": doc.chunk_size,
-                    "uploaded_at": doc.uploaded_at.isoformat(),
-                    "document_metadata": doc.document_metadata
+                    "id": str(row.id),
+                    "filename": row.filename,
+                    "file_size": row.file_size,
+                    "text_length": row.text_length,
+                    "num_chunks": row.num_chunks,
+                    "chunk_strategy": row.chunk_strategy,
+                    "chunk_size": row.chunk_size,
+                    "uploaded_at": row.uploaded_at.isoformat()
                 }
-                for doc in documents
+                for row in rows
             ],
-            "total_count": total_count,
-            "skip": skip,
+            "next_cursor": encode_cursor(rows[-1].uploaded_at, rows[-1].id) if has_more else None,
             "limit": limit
         }
+        if include_total:
+            async def _count() -> int:
+                return (await db.execute(
+                    select(func.count()).select_from(Document).where(Document.tenant_id == tenant)
+                )).scalar()
+            response["total_count"] = await document_count(tenant).get(_count)
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving documents: {str(e)}")
 
@@ -157,28 +458,19 @@ async def list_documents(
 @router.get("/documents/{document_id}")
 async def get_document(
     document_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    tenant: str = Depends(get_tenant)
 ) -> dict:
     from sqlalchemy import select
 
     try:
-        result = await db.execute(select(Document).where(Document.id == document_id))
+        result = await db.execute(select(Document).where(Document.id == document_id, Document.tenant_id == tenant))
         document = result.scalar_one_or_none()
 
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        return {
-            "document_id": str(document.id),
-            "filename": document.filename,
-            "file_size": document.file_size,
-            "text_length": document.text_length,
-            "num_chunks": document.num_chunks,
-            "chunk_strategy": document.chunk_strategy,
-            "chunk_size": document.chunk_size,
-            "uploaded_at": document.uploaded_at.isoformat(),
-            "document_metadata": document.document_metadata
-        }
+        return _document_dict(document)
     except HTTPException:
         raise
     except Exception as e:
@@ -188,27 +480,91 @@ async def get_document(
 @router.delete("/documents/{document_id}")
 async def delete_document(
     document_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    tenant: str = Depends(get_tenant)
 ) -> dict:
-    from sqlalchemy import select, delete
+    """Delete a document and its vectors"""
+    from sqlalchemy import delete
 
     try:
-        result = await db.execute(select(Document).where(Document.id == document_id))
-        document = result.scalar_one_or_none()
+        result = await db.execute(
+            delete(Document)
+            .where(Document.id == document_id, Document.tenant_id == tenant)
+            .returning(Document.id, Document.filename, Document.num_chunks)
+        )
+        deleted = result.first()
 
-        if not document:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        await db.execute(delete(Document).where(Document.id == document_id))
+        # Vectors first: if this fails the row is rolled back and the delete can be retried
+        await _delete_document_vectors([deleted], tenant)
+        await add_usage(db, tenant, -1, -(deleted.num_chunks or 0))
         await db.commit()
+        document_count(tenant).add(-1)
 
         return {
-            "message": "Document metadata deleted successfully",
-            "document_id": str(document.id),
-            "filename": document.filename
+            "message": "Document deleted successfully",
+            "document_id": str(deleted.id),
+            "filename": deleted.filename
         }
     except HTTPException:
         raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
+
+
+@router.post("/documents/bulk-get")
+async def get_documents_bulk(
+    request: BulkIdsRequest,
+    db: AsyncSession = Depends(get_db),
+    tenant: str = Depends(get_tenant)
+) -> dict:
+    """Fetch many documents with a single SELECT ... WHERE id IN (...)"""
+    from sqlalchemy import select
+
+    try:
+        result = await db.execute(select(Document).where(Document.id.in_(request.ids), Document.tenant_id == tenant))
+        documents = result.scalars().all()
+        found = {str(document.id) for document in documents}
+
+        return {
+            "documents": [_document_dict(document) for document in documents],
+            "missing_ids": [doc_id for doc_id in dict.fromkeys(request.ids) if doc_id not in found]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving documents: {str(e)}")
+
+
+@router.post("/documents/bulk-delete")
+async def delete_documents_bulk(
+    request: BulkIdsRequest,
+    db: AsyncSession = Depends(get_db),
+    tenant: str = Depends(get_tenant)
+) -> dict:
+    """Delete many documents with a single DELETE ... RETURNING, and their vectors"""
+    from sqlalchemy import delete
+
+    try:
+        result = await db.execute(
+            delete(Document)
+            .where(Document.id.in_(request.ids), Document.tenant_id == tenant)
+            .returning(Document.id, Document.filename, Document.num_chunks)
+        )
+        deleted = result.all()
+        await _delete_document_vectors(deleted, tenant)
+        if deleted:
+            await add_usage(db, tenant, -len(deleted), -sum(row.num_chunks or 0 for row in deleted))
+        await db.commit()
+        document_count(tenant).add(-len(deleted))
+
+        deleted_ids = {str(row.id) for row in deleted}
+        return {
+            "message": f"{len(deleted)} documents deleted",
+            "deleted": [{"document_id": str(row.id), "filename": row.filename} for row in deleted],
+            "missing_ids": [doc_id for doc_id in dict.fromkeys(request.ids) if doc_id not in deleted_ids]
+        }
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error deleting documents: {str(e)}")
@@ -4,20 +4,18 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
-from models import InterviewBooking
 from services.rag_service import RAGService
+from services.scheduling import SLOT_MINUTES, SlotUnavailableError, book_slot, get_availability, now_local, parse_slot
+from services.tenants import check_session_id, get_tenant, session_key
+from services.filters import RetrievalFilter
 #from services.rag_service import generate_response
-from redis_memory import RedisChatMemory
+from chat_memory import get_chat_memory
+from chat_memory_base import ChatMemory
+from datetime import date
 import uuid
 
 router = APIRouter(prefix="/rag", tags=["RAG"])
 
-# Dependency for Redis memory
-async def get_chat_memory():
-    memory = RedisChatMemory()
-    await memory.connect()
-    return memory
-
 async def get_rag_service():
     return RAGService()
 
@@ -26,6 +24,7 @@ async def get_rag_service():
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
+    filters: Optional[RetrievalFilter] = None  # only retrieve from matching chunks
 
 class ChatResponse(BaseModel):
     response: str
@@ -50,16 +49,20 @@ class InterviewBookingResponse(BaseModel):
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_rag(
     request: ChatRequest,
-    chat_memory: RedisChatMemory = Depends(get_chat_memory),
-    rag_service: RAGService = Depends(get_rag_service)
+    chat_memory: ChatMemory = Depends(get_chat_memory),
+    rag_service: RAGService = Depends(get_rag_service),
+    tenant: str = Depends(get_tenant)
 ):
-    """Chat endpoint with RAG and memory"""
+    """Chat endpoint with RAG and memory, answering from the caller's tenant only"""
     
     # Generate session ID if not provided
-    session_id = request.session_id or str(uuid.uuid4())
+    session_id = check_session_id(request.session_id) if request.session_id else str(uuid.uuid4())
     
     try:
-        result = await rag_service.generate_response(request.message, session_id, chat_memory)
+        result = await rag_service.generate_response(
+            request.message, session_id, chat_memory, tenant,
+            metadata_filter=request.filters.to_metadata_filter() if request.filters else None
+        )
         return ChatResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
@@ -69,20 +72,17 @@ async def book_interview(
     booking: InterviewBookingRequest,
     db: AsyncSession = Depends(get_db)
 ):
-    """Book an interview slot"""
+    """Book an interview slot; date and time are in BOOKING_TIMEZONE"""
     
     try:
-        # Create booking record
-        interview = InterviewBooking(
-            name=booking.name,
-            email=booking.email,
-            date=booking.date,
-            time=booking.time
-        )
-        
-        db.add(interview)
-        await db.commit()
-        await db.refresh(interview)
+        slot_start = parse_slot(booking.date, booking.time)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if slot_start < now_local():
+        raise HTTPException(status_code=400, detail="Cannot book a slot in the past")
+
+    try:
+        interview = await book_slot(db, booking.name, booking.email, slot_start)
         
         return InterviewBookingResponse(
             booking_id=interview.id,
@@ -93,18 +93,35 @@ async def book_interview(
             status=interview.status
         )
         
+    except SlotUnavailableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Booking failed: {str(e)}")
 
+@router.get("/availability")
+async def get_interview_availability(
+    start_date: date,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Free interview slots per day between start_date and end_date (inclusive)"""
+    try:
+        slots = await get_availability(db, start_date, end_date or start_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"slot_minutes": SLOT_MINUTES, "availability": slots}
+
 @router.get("/chat-history/{session_id}")
 async def get_chat_history(
     session_id: str,
-    chat_memory: RedisChatMemory = Depends(get_chat_memory)
+    chat_memory: ChatMemory = Depends(get_chat_memory),
+    tenant: str = Depends(get_tenant)
 ):
     """Get chat history for session"""
+    check_session_id(session_id)
     try:
-        messages = await chat_memory.get_messages(session_id)
+        messages = await chat_memory.get_messages(session_key(tenant, session_id))
         return {"session_id": session_id, "messages": messages}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get chat history: {str(e)}")
@@ -112,11 +129,13 @@ async def get_chat_history(
 @router.delete("/chat-history/{session_id}")
 async def clear_chat_history(
     session_id: str,
-    chat_memory: RedisChatMemory = Depends(get_chat_memory)
+    chat_memory: ChatMemory = Depends(get_chat_memory),
+    tenant: str = Depends(get_tenant)
 ):
     """Clear chat history for session"""
+    check_session_id(session_id)
     try:
-        await chat_memory.clear_messages(session_id)
+        await chat_memory.clear_messages(session_key(tenant, session_id))
         return {"message": "Chat history cleared", "session_id": session_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to clear chat history: {str(e)}")
\ No newline at end of file
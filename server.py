@@ -0,0 +1,135 @@
+"""
+Production server entry point.
+
+On Linux/macOS this runs gunicorn with uvicorn workers in pre-fork mode:
+the app (and the SentenceTransformer weights) are loaded once in the master
+process and then forked, so worker processes share those memory pages
+copy-on-write instead of each loading their own copy. Each worker then
+gets its own SQL connections, Pinecone client and a bounded number of
+torch threads so workers do not oversubscribe the CPU.
+
+Without gunicorn (e.g. on Windows) it falls back to uvicorn's own
+multi-process mode, where every worker loads the model separately.
+
+    python server.py                       # main:app, one worker per core
+    python server.py --workers 4 --port 8080
+    python server.py simple_app:app --reload
+"""
+import argparse
+import gc
+import importlib
+import os
+import sys
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WORKERS = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+WORKER_TIMEOUT = int(os.getenv("WORKER_TIMEOUT", "120"))
+PRELOAD_MODEL = os.getenv("PRELOAD_MODEL", "true").lower() == "true"
+
+
+def torch_threads_per_worker(workers: int) -> int:
+    """Intra-op threads per worker: TORCH_THREADS, or the cores split evenly across workers"""
+    configured = os.getenv("TORCH_THREADS")
+    if configured:
+        return int(configured)
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def import_app(app_path: str):
+    module_name, _, attribute = app_path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute or "app")
+
+
+def preload_shared_state():
+    """Load model weights in the master so forked workers share them copy-on-write"""
+    # Only for apps that use the embedding service
+    if PRELOAD_MODEL and "services.embeddings" in sys.modules:
+        from services.embeddings import _get_model
+        try:
+            # Only loads weights; no encode() here, so no torch thread pool exists before fork
+            _get_model()
+        except ImportError:
+            print("⚠️  sentence-transformers not installed, model not preloaded")
+    # Move everything loaded so far out of the GC's reach; collections in the
+    # workers would otherwise touch (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+
+def configure_worker(threads: int):
+    """Per-worker setup after fork: own thread count, connections and clients"""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    # Connections and HTTP clients inherited from the master must not be shared
+    if "database" in sys.modules:
+        sys.modules["database"].engine.sync_engine.dispose(close=False)
+    if "services.vectorstore_pinecone" in sys.modules:
+        sys.modules["services.vectorstore_pinecone"].PineconeVectorStore.reset_index()
+
+
+def run_gunicorn(app_path: str, host: str, port: int, workers: int, threads: int):
+    from gunicorn.app.base import BaseApplication
+
+    class PreforkApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("timeout", WORKER_TIMEOUT)
+            self.cfg.set("preload_app", True)
+            self.cfg.set("post_fork", lambda server, worker: configure_worker(threads))
+
+        def load(self):
+            app = import_app(app_path)
+            preload_shared_state()
+            return app
+
+    PreforkApplication().run()
+
+
+def check_single_writer(workers: int):
+    """A persisted local vector store is written by one process, so it needs a single worker"""
+    from services.vectorstore import VECTOR_STORE_BACKEND
+    if workers > 1 and VECTOR_STORE_BACKEND.lower() == "local" and os.getenv("LOCAL_VECTOR_DIR"):
+        raise SystemExit("❌ LOCAL_VECTOR_DIR is set: the local vector store supports one worker, "
+                         "run with --workers 1 (or WEB_CONCURRENCY=1)")
+
+
+def run(app_path: str = "main:app", host: str = HOST, port: int = PORT,
+        workers: int = WORKERS, reload: bool = False):
+    if reload:
+        # Development: single process with auto-reload
+        import uvicorn
+        uvicorn.run(app_path, host=host, port=port, reload=True)
+        return
+
+    check_single_writer(workers)
+    threads = torch_threads_per_worker(workers)
+    # Must be set before torch is first imported (in the master, by preload)
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(variable, str(threads))
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        import uvicorn
+        print("⚠️  gunicorn not available, each uvicorn worker loads its own model copy")
+        uvicorn.run(app_path, host=host, port=port, workers=workers)
+        return
+    run_gunicorn(app_path, host, port, workers, threads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("app", nargs="?", default="main:app")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--reload", action="store_true", help="development mode: one process, auto-reload")
+    args = parser.parse_args()
+    run(args.app, args.host, args.port, args.workers, args.reload)
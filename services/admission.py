@@ -0,0 +1,150 @@
+"""
+Admission control and work lanes.
+
+Blocking work (embedding, vector store calls, text extraction) runs on one
+of two bounded thread pools: "interactive" for chat and "bulk" for
+ingestion, chosen by the lane of the current request. Bulk work also
+yields between embedding batches while interactive work is pending, so a
+burst of uploads cannot starve chat of CPU.
+
+Each endpoint class has a concurrency limit and a bounded wait queue;
+requests that would queue beyond it are rejected with 429, and requests
+that waited longer than the allowed time with 503, both with Retry-After.
+"""
+import asyncio
+import functools
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict
+
+from services.metrics import Counter, Gauge, Histogram
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+INTERACTIVE_THREADS = int(os.getenv("INTERACTIVE_THREADS", "4"))
+BULK_THREADS = int(os.getenv("BULK_THREADS", "2"))
+# Longest a bulk batch waits for pending interactive work before running anyway
+BULK_YIELD_MAX_S = float(os.getenv("BULK_YIELD_MAX_MS", "500")) / 1000
+
+ADMISSION_QUEUE_DEPTH = Gauge("admission_queue_depth", "Requests waiting for admission", ("endpoint",))
+ADMISSION_IN_FLIGHT = Gauge("admission_in_flight", "Admitted requests being handled", ("endpoint",))
+ADMISSION_WAIT = Histogram("admission_wait_seconds", "Time spent waiting for admission", ("endpoint",))
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests shed by admission control", ("endpoint", "reason"))
+EXECUTOR_PENDING = Gauge("executor_pending_tasks", "Blocking tasks queued or running per lane", ("lane",))
+
+_lane: ContextVar[str] = ContextVar("work_lane", default=INTERACTIVE)
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_pending: Dict[str, int] = {INTERACTIVE: 0, BULK: 0}
+
+
+def set_lane(lane: str):
+    """Route blocking work of the current request to the given lane"""
+    _lane.set(lane)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+def _executor(lane: str) -> ThreadPoolExecutor:
+    # Created on first use, i.e. after a pre-fork server has forked its workers
+    if lane not in _executors:
+        threads = BULK_THREADS if lane == BULK else INTERACTIVE_THREADS
+        _executors[lane] = ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"{lane}-lane")
+    return _executors[lane]
+
+
+async def run_blocking(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call on the current lane's thread pool"""
+    lane = current_lane()
+    _pending[lane] += 1
+    EXECUTOR_PENDING.set(_pending[lane], lane=lane)
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor(lane), functools.partial(fn, *args, **kwargs))
+    finally:
+        _pending[lane] -= 1
+        EXECUTOR_PENDING.set(_pending[lane], lane=lane)
+
+
+async def yield_to_interactive():
+    """Called by bulk work between batches: wait (bounded) while interactive work is pending"""
+    if current_lane() != BULK:
+        return
+    deadline = time.monotonic() + BULK_YIELD_MAX_S
+    while _pending[INTERACTIVE] and time.monotonic() < deadline:
+        await asyncio.sleep(0.005)
+
+
+class Overloaded(Exception):
+    """Request shed by admission control"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, time-limited wait queue for one endpoint class"""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait_s: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.retry_after = max(1, math.ceil(max_wait_s))
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        start = time.perf_counter()
+        if not self._semaphore.locked():
+            # A slot is free: acquire() returns without suspending
+            await self._semaphore.acquire()
+        else:
+            if self.waiting >= self.max_queue:
+                ADMISSION_REJECTED.inc(endpoint=self.name, reason="queue_full")
+                raise Overloaded(429, f"Too many {self.name} requests queued", self.retry_after)
+
+            self.waiting += 1
+            ADMISSION_QUEUE_DEPTH.set(self.waiting, endpoint=self.name)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait_s)
+            except asyncio.TimeoutError:
+                ADMISSION_REJECTED.inc(endpoint=self.name, reason="wait_timeout")
+                raise Overloaded(503, f"{self.name} is overloaded, try again later", self.retry_after)
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUE_DEPTH.set(self.waiting, endpoint=self.name)
+        ADMISSION_WAIT.observe(time.perf_counter() - start, endpoint=self.name)
+
+        ADMISSION_IN_FLIGHT.inc(endpoint=self.name)
+        try:
+            yield
+        finally:
+            ADMISSION_IN_FLIGHT.dec(endpoint=self.name)
+            self._semaphore.release()
+
+
+controllers = {
+    "chat": AdmissionController(
+        "chat",
+        max_concurrent=int(os.getenv("CHAT_MAX_CONCURRENT", "32")),
+        max_queue=int(os.getenv("CHAT_MAX_QUEUE", "64")),
+        max_wait_s=float(os.getenv("CHAT_MAX_WAIT_MS", "2000")) / 1000,
+    ),
+    "ingest": AdmissionController(
+        "ingest",
+        max_concurrent=int(os.getenv("INGEST_MAX_CONCURRENT", "4")),
+        max_queue=int(os.getenv("INGEST_MAX_QUEUE", "16")),
+        max_wait_s=float(os.getenv("INGEST_MAX_WAIT_MS", "10000")) / 1000,
+    ),
+}
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterable, Iterator, List
 
 
 
@@ -44,4 +44,116 @@ def chunk_by_size(text: str, size: int = 1000, overlap: int = 200) -> List[str]:
             break
         start = end - overlap
     # filter out empty
-    return [c for c in chunks if c]
\ No newline at end of file
+    return [c for c in chunks if c]
+
+
+def _clean_paragraph(p: str) -> str:
+    p = p.strip()
+    if not p:
+        return ""
+    return p.replace("\n", " ").strip()
+
+
+class ParagraphChunker:
+    """
+    Incremental chunk_by_paragraphs: feed text pieces in order and get the
+    same paragraphs back, without ever holding more than the current
+    (unfinished) paragraph.
+    """
+
+    def __init__(self):
+        self._pending: List[str] = []  # non-empty pieces of the unfinished paragraph
+
+    def feed(self, piece: str) -> List[str]:
+        if not piece:
+            return []
+        raw = []
+        # A "\n\n" split across the boundary; the pending text holds no "\n\n" of its own
+        if self._pending and self._pending[-1].endswith("\n") and piece.startswith("\n"):
+            self._pending[-1] = self._pending[-1][:-1]
+            raw.append("".join(self._pending))
+            self._pending = []
+            piece = piece[1:]
+        parts = piece.split("\n\n")
+        if len(parts) > 1:
+            self._pending.append(parts[0])
+            raw.append("".join(self._pending))
+            raw.extend(parts[1:-1])
+            self._pending = []
+        if parts[-1]:
+            self._pending.append(parts[-1])
+        return [p for p in map(_clean_paragraph, raw) if p]
+
+    def finish(self) -> List[str]:
+        last = _clean_paragraph("".join(self._pending))
+        self._pending = []
+        return [last] if last else []
+
+
+class SizeChunker:
+    """
+    Incremental chunk_by_size: same windows as the whole-text version, keeping
+    only the current window and the piece being processed in memory.
+    """
+
+    def __init__(self, size: int = 1000, overlap: int = 200):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        if overlap >= size:
+            raise ValueError("overlap must be smaller than size")
+        self.size = size
+        self.overlap = overlap
+        self._buffer = ""
+        self._buffer_start = 0  # absolute offset of _buffer[0]
+        self._start = 0  # absolute offset of the next window
+
+    def feed(self, piece: str) -> List[str]:
+        chunks = []
+        buffer = self._buffer + piece
+        buffer_end = self._buffer_start + len(buffer)
+        # Emit only windows that cannot be the last one (more text follows them)
+        while buffer_end - self._start > self.size:
+            offset = self._start - self._buffer_start
+            chunk = buffer[offset:offset + self.size].strip()
+            if chunk:
+                chunks.append(chunk)
+            self._start += self.size - self.overlap
+        # Keep text from the next window start on
+        cut = min(max(self._start - self._buffer_start, 0), len(buffer))
+        self._buffer = buffer[cut:]
+        self._buffer_start += cut
+        return chunks
+
+    def finish(self) -> List[str]:
+        chunks = []
+        if self._buffer_start + len(self._buffer) > self._start:
+            chunk = self._buffer[self._start - self._buffer_start:].strip()
+            if chunk:
+                chunks.append(chunk)
+        self._buffer = ""
+        return chunks
+
+
+def _drain(chunker, pieces: Iterable[str]) -> Iterator[str]:
+    for piece in pieces:
+        yield from chunker.feed(piece)
+    yield from chunker.finish()
+
+
+def iter_chunks_by_paragraphs(pieces: Iterable[str]) -> Iterator[str]:
+    """Streaming chunk_by_paragraphs over text pieces (e.g. a decoded upload stream)"""
+    return _drain(ParagraphChunker(), pieces)
+
+
+def iter_chunks_by_size(pieces: Iterable[str], size: int = 1000, overlap: int = 200) -> Iterator[str]:
+    """Streaming chunk_by_size over text pieces; arguments are validated immediately"""
+    return _drain(SizeChunker(size, overlap), pieces)
+
+
+def create_chunker(strategy: str, size: int = 1000):
+    """Incremental chunker for an upload's chunk_strategy ('paragraph' or 'fixed')"""
+    if strategy == "paragraph":
+        return ParagraphChunker()
+    if strategy == "fixed":
+        return SizeChunker(size=size)
+    raise ValueError("Unknown chunk strategy. Use 'paragraph' or 'fixed'")
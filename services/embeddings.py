@@ -1,22 +1,34 @@
 from typing import List
-from sentence_transformers import SentenceTransformer
-import asyncio
+import os
+
+from services.admission import BULK, current_lane, run_blocking, yield_to_interactive
+
+# Texts per encode call for bulk (ingest) work, so interactive encodes can run in between
+BULK_EMBED_BATCH = int(os.getenv("BULK_EMBED_BATCH", "64"))
 
 _model = None
 
 def _get_model():
     global _model
     if _model is None:
+        # Imported lazily so modules using embeddings load without torch installed
+        from sentence_transformers import SentenceTransformer
         _model = SentenceTransformer("all-MiniLM-L6-v2")
     return _model
 
 async def generate_embeddings(texts: List[str], model: str = "transformer") -> List[List[float]]:
     transformer_model = _get_model()
 
-    def _encode_sync():
-        return transformer_model.encode(texts).tolist()
+    def _encode_sync(batch: List[str]) -> List[List[float]]:
+        return transformer_model.encode(batch).tolist()
+
+    if current_lane() != BULK or len(texts) <= BULK_EMBED_BATCH:
+        return await run_blocking(_encode_sync, texts)
 
-    embeddings = await asyncio.to_thread(_encode_sync)
+    embeddings = []
+    for i in range(0, len(texts), BULK_EMBED_BATCH):
+        await yield_to_interactive()
+        embeddings.extend(await run_blocking(_encode_sync, texts[i:i + BULK_EMBED_BATCH]))
     return embeddings
 
 def generate_embeddings_sync(texts: List[str]) -> List[List[float]]:
@@ -0,0 +1,228 @@
+"""
+Metadata filters for retrieval.
+
+Filters use Pinecone's metadata filter syntax throughout: RetrievalFilter
+(the chat API's filter model) compiles to it, PineconeVectorStore passes it
+through unchanged, and LocalVectorStore resolves it with MetadataIndex, an
+inverted index over keyword fields plus sorted arrays over numeric fields, so
+a filtered query only scores the selected vectors.
+
+Supported syntax: {"field": value}, {"field": {"$eq" | "$ne" | "$in" | "$nin" |
+"$gt" | "$gte" | "$lt" | "$lte": ...}}, several fields (AND), "$and" and "$or".
+"""
+import bisect
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from pydantic import BaseModel, field_validator, model_validator
+
+# Chunk metadata fields with an index in the local store
+KEYWORD_FIELDS = ("filename", "document_id", "chunk_strategy")
+RANGE_FIELDS = ("uploaded_at_ts",)
+
+_RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+
+def to_timestamp(value: datetime) -> float:
+    """Epoch seconds; naive datetimes are taken as UTC (like Document.uploaded_at)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RetrievalFilter(BaseModel):
+    """Restrict retrieval to some files, documents, chunk strategy or upload dates"""
+    filename: Optional[List[str]] = None
+    document_id: Optional[List[str]] = None
+    chunk_strategy: Optional[str] = None
+    uploaded_after: Optional[datetime] = None
+    uploaded_before: Optional[datetime] = None
+
+    @field_validator("filename", "document_id", mode="before")
+    @classmethod
+    def _as_list(cls, value: Union[str, List[str], None]):
+        return [value] if isinstance(value, str) else value
+
+    @model_validator(mode="after")
+    def _check_range(self):
+        if self.uploaded_after and self.uploaded_before and \
+                to_timestamp(self.uploaded_after) > to_timestamp(self.uploaded_before):
+            raise ValueError("uploaded_after must not be later than uploaded_before")
+        return self
+
+    def to_metadata_filter(self) -> Optional[Dict[str, Any]]:
+        """Pinecone-syntax filter, or None when nothing is restricted"""
+        conditions: Dict[str, Any] = {}
+        if self.filename is not None:
+            conditions["filename"] = {"$in": self.filename}
+        if self.document_id is not None:
+            conditions["document_id"] = {"$in": self.document_id}
+        if self.chunk_strategy is not None:
+            conditions["chunk_strategy"] = {"$eq": self.chunk_strategy}
+        uploaded = {}
+        if self.uploaded_after is not None:
+            uploaded["$gte"] = to_timestamp(self.uploaded_after)
+        if self.uploaded_before is not None:
+            uploaded["$lte"] = to_timestamp(self.uploaded_before)
+        if uploaded:
+            conditions["uploaded_at_ts"] = uploaded
+        return conditions or None
+
+
+def _operators(condition: Any) -> Dict[str, Any]:
+    if isinstance(condition, dict):
+        return condition
+    return {"$eq": condition}
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    try:
+        if operator == "$eq":
+            return value == operand
+        if operator == "$ne":
+            return value != operand
+        if operator == "$in":
+            return value in operand
+        if operator == "$nin":
+            return value not in operand
+        if value is None:
+            return False
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def matches(metadata: Dict[str, Any], metadata_filter: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a filter against one metadata dict"""
+    if not metadata_filter:
+        return True
+    for key, condition in metadata_filter.items():
+        if key == "$and":
+            if not all(matches(metadata, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(metadata, part) for part in condition):
+                return False
+        elif not all(_compare(metadata.get(key), op, operand) for op, operand in _operators(condition).items()):
+            return False
+    return True
+
+
+class MetadataIndex:
+    """Positions of vectors by metadata value, for one vector shard.
+
+    Keyword fields map each value to the set of positions holding it; range
+    fields keep (value, position) pairs in a sorted list answered by bisection.
+    Conditions on other fields fall back to checking each candidate's metadata.
+    Not thread-safe; the owning shard serialises access.
+    """
+
+    def __init__(self, keyword_fields: Iterable[str] = KEYWORD_FIELDS, range_fields: Iterable[str] = RANGE_FIELDS):
+        self._keywords: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in keyword_fields}
+        self._ranges: Dict[str, List[tuple]] = {field: [] for field in range_fields}
+
+    def add(self, position: int, metadata: Dict[str, Any]):
+        for field, postings in self._keywords.items():
+            value = metadata.get(field)
+            if value is not None:
+                postings.setdefault(value, set()).add(position)
+        for field, entries in self._ranges.items():
+            value = metadata.get(field)
+            if isinstance(value, (int, float)):
+                bisect.insort(entries, (value, position))
+
+    def remove(self, position: int, metadata: Dict[str, Any]):
+        for field, postings in self._keywords.items():
+            value = metadata.get(field)
+            positions = postings.get(value)
+            if positions is not None:
+                positions.discard(position)
+                if not positions:
+                    del postings[value]
+        for field, entries in self._ranges.items():
+            value = metadata.get(field)
+            if isinstance(value, (int, float)):
+                i = bisect.bisect_left(entries, (value, position))
+                if i < len(entries) and entries[i] == (value, position):
+                    del entries[i]
+
+    def move(self, old: int, new: int, metadata: Dict[str, Any]):
+        """Re-point an entry after its vector moved from position old to new"""
+        self.remove(old, metadata)
+        self.add(new, metadata)
+
+    def select(self, metadata_filter: Dict[str, Any], metadata: List[Dict[str, Any]], size: int) -> Set[int]:
+        """Positions (below size) whose metadata satisfies the filter"""
+        selected: Optional[Set[int]] = None
+        unindexed = {}
+        for key, condition in metadata_filter.items():
+            if key == "$and":
+                for part in condition:
+                    selected = self._intersect(selected, self.select(part, metadata, size))
+            elif key == "$or":
+                union: Set[int] = set()
+                for part in condition:
+                    union |= self.select(part, metadata, size)
+                selected = self._intersect(selected, union)
+            elif key in self._keywords or key in self._ranges:
+                for operator, operand in _operators(condition).items():
+                    selected = self._intersect(selected, self._lookup(key, operator, operand, size))
+            else:
+                unindexed[key] = condition
+            if selected is not None and not selected:
+                return selected
+        if unindexed:
+            candidates = range(size) if selected is None else selected
+            selected = {i for i in candidates if matches(metadata[i], unindexed)}
+        return set(range(size)) if selected is None else selected
+
+    @staticmethod
+    def _intersect(selected: Optional[Set[int]], positions: Set[int]) -> Set[int]:
+        if selected is None:
+            return positions
+        if len(positions) < len(selected):
+            return positions & selected
+        return selected & positions
+
+    def _lookup(self, field: str, operator: str, operand: Any, size: int) -> Set[int]:
+        if field in self._keywords:
+            postings = self._keywords[field]
+            if operator == "$eq":
+                return set(postings.get(operand, ()))
+            if operator == "$in":
+                return set().union(*(postings.get(value, ()) for value in operand))
+            if operator in ("$ne", "$nin"):
+                excluded = [operand] if operator == "$ne" else operand
+                return set(range(size)).difference(*(postings.get(value, ()) for value in excluded))
+            # Ordering on a keyword field: compare each distinct value
+            return set().union(*(
+                positions for value, positions in postings.items() if _compare(value, operator, operand)
+            ))
+
+        entries = self._ranges[field]
+        if operator in ("$eq", "$in"):
+            values = [operand] if operator == "$eq" else operand
+            result: Set[int] = set()
+            for value in values:
+                lo = bisect.bisect_left(entries, (value, -1))
+                hi = bisect.bisect_left(entries, (value, size))
+                result.update(position for _, position in entries[lo:hi])
+            return result
+        if operator in ("$ne", "$nin"):
+            excluded = [operand] if operator == "$ne" else operand
+            return set(range(size)) - self._lookup(field, "$in", excluded, size)
+        if operator not in _RANGE_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        if operator in ("$gt", "$gte"):
+            key = (operand, size) if operator == "$gt" else (operand, -1)
+            return {position for _, position in entries[bisect.bisect_left(entries, key):]}
+        key = (operand, -1) if operator == "$lt" else (operand, size)
+        return {position for _, position in entries[:bisect.bisect_left(entries, key)]}
@@ -0,0 +1,49 @@
+import base64
+import json
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Tuple
+
+from services.metrics import record_cache
+
+
+def encode_cursor(uploaded_at: datetime, document_id: str) -> str:
+    """Opaque keyset cursor pointing at the last row of a page"""
+    raw = json.dumps([uploaded_at.isoformat(), document_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        uploaded_at, document_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(uploaded_at), str(document_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+class CachedCount:
+    """Row count refreshed at most once per ``ttl`` seconds.
+
+    Between refreshes the value is adjusted with ``add`` so it stays close
+    to the real count without re-scanning the table.
+    """
+
+    def __init__(self, name: str, ttl: float = 30.0):
+        self.name = name
+        self.ttl = ttl
+        self._value: Optional[int] = None
+        self._expires_at = 0.0
+
+    async def get(self, compute: Callable[[], Awaitable[int]]) -> int:
+        expired = self._value is None or time.monotonic() >= self._expires_at
+        record_cache(self.name, not expired)
+        if expired:
+            self._value = await compute()
+            self._expires_at = time.monotonic() + self.ttl
+        return self._value
+
+    def add(self, delta: int):
+        if self._value is not None:
+            self._value = max(0, self._value + delta)
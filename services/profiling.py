@@ -0,0 +1,199 @@
+"""
+On-demand sampling profiler for hot-path requests.
+
+A background thread samples the stacks of every thread (event loop and
+executor workers) while at least one profile session is active; samples
+are aggregated per session in folded-stack format (one ``frame;frame;...
+count`` line per stack), which flamegraph.pl and speedscope read directly.
+Sessions overlapping in time share samples, so a profile taken under
+concurrency includes whatever else was running.
+
+Finished profiles go to a bounded ring of files in PROFILE_DIR.
+"""
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+
+class ProfilingSettings:
+    """Runtime-adjustable profiling switches (changed through the admin API)"""
+
+    def __init__(self):
+        self.enabled = os.getenv("PROFILE_ENABLED", "false").lower() == "true"
+        # Fraction of hot-path requests profiled while enabled
+        self.sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0.01"))
+        # While enabled, requests still running after this many milliseconds are profiled
+        # from then on (0 disables)
+        self.slow_ms = float(os.getenv("PROFILE_SLOW_MS", "2000"))
+
+    def as_dict(self) -> dict:
+        return {"enabled": self.enabled, "sample_rate": self.sample_rate, "slow_ms": self.slow_ms}
+
+
+settings = ProfilingSettings()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class ProfileSession:
+    """Samples collected between start() and stop()"""
+
+    def __init__(self, sampler: "StackSampler"):
+        self.sampler = sampler
+        self.samples: Counter = Counter()
+        self.started_at: Optional[float] = None
+
+    def start(self):
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+            self.sampler.add(self)
+
+    def stop(self):
+        self.sampler.remove(self)
+
+    @property
+    def active(self) -> bool:
+        return self.started_at is not None
+
+
+class StackSampler:
+    """Background thread taking a stack sample of all threads every interval"""
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self._sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, session: ProfileSession):
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, session: ProfileSession):
+        """Detach a session; once this returns the sampler no longer touches its samples"""
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+
+    def _sample(self) -> List[str]:
+        own_id = threading.get_ident()
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            stacks.append(";".join(reversed(labels)))
+        return stacks
+
+    def _run(self):
+        while True:
+            with self._lock:
+                sessions = list(self._sessions)
+            if not sessions:
+                # Idle until the next session starts
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            stacks = self._sample()
+            # Under the lock, so remove() waits for an update in progress and
+            # a stopped session's Counter can be read without racing this thread
+            with self._lock:
+                for session in self._sessions:
+                    session.samples.update(stacks)
+            time.sleep(self.interval)
+
+
+sampler = StackSampler()
+
+
+def should_sample(forced: bool) -> bool:
+    """Decide up front whether a request is profiled from its start"""
+    return forced or (settings.enabled and random.random() < settings.sample_rate)
+
+
+class RequestProfiler:
+    """Profiles one request: from the start if sampled, otherwise once it turns slow"""
+
+    def __init__(self, handler: str, sampled: bool):
+        self.handler = handler
+        self.session = ProfileSession(sampler)
+        self.reason = "sampled" if sampled else "slow"
+        self._timer: Optional[asyncio.TimerHandle] = None
+        if sampled:
+            self.session.start()
+        elif settings.enabled and settings.slow_ms > 0:
+            self._timer = asyncio.get_running_loop().call_later(settings.slow_ms / 1000, self.session.start)
+
+    async def finish(self, duration_ms: float) -> Optional[str]:
+        """Stop sampling and save the profile if one was taken; returns the file name"""
+        if self._timer is not None:
+            self._timer.cancel()
+        self.session.stop()
+        if not self.session.active or not self.session.samples:
+            return None
+        return await asyncio.to_thread(
+            save_profile, self.session.samples, self.handler, self.reason, duration_ms
+        )
+
+
+def save_profile(samples: Counter, handler: str, reason: str, duration_ms: float) -> str:
+    """Write folded stacks to the profile ring, dropping the oldest files beyond PROFILE_MAX_FILES"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{handler}_{reason}_{duration_ms:.0f}ms.folded"
+    with open(os.path.join(PROFILE_DIR, name), "w") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+    profiles = list_profiles()
+    for stale in profiles[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, stale["name"]))
+        except FileNotFoundError:
+            pass
+    return name
+
+
+def list_profiles() -> List[Dict]:
+    """Saved profiles, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(PROFILE_DIR):
+        if entry.is_file() and entry.name.endswith(".folded"):
+            stat = entry.stat()
+            profiles.append({
+                "name": entry.name,
+                "size": stat.st_size,
+                "created_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat()
+            })
+    profiles.sort(key=lambda p: p["name"], reverse=True)
+    return profiles
+
+
+def profile_path(name: str) -> Optional[str]:
+    """Path of a saved profile, or None if the name is not a profile in the ring"""
+    if os.path.basename(name) != name or not name.endswith(".folded"):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
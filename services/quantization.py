@@ -0,0 +1,364 @@
+"""
+Vector storage for LocalVectorStore shards, uncompressed or quantised.
+
+- float32: the normalised vectors in RAM, exact search (4 bytes per dimension)
+- int8: scalar quantisation with one scale per vector (1 byte per dimension + 4)
+- pq: product quantisation, PQ_SUBVECTORS one-byte codes per vector against
+  256 k-means centroids per subspace
+
+The compressed modes scan their codes to pick RESCORE_FACTOR * top_k
+candidates and re-score those with the float32 vectors, which are kept in a
+private memory-mapped temp file rather than in RAM (in temp_dir when given,
+so it can be kept off a RAM-backed /tmp). A PQ shard searches the
+float32 file directly until it holds PQ_MIN_TRAIN vectors to train on.
+
+Storages only touch persisted files in save(prefix, size) and when loaded
+with a prefix; every file name starts with that prefix, so a shard can write
+a complete new generation before switching to it.
+"""
+import os
+import tempfile
+import weakref
+from typing import Optional
+
+import numpy as np
+
+COMPRESSIONS = ("float32", "int8", "pq")
+
+PQ_SUBVECTORS = int(os.getenv("LOCAL_PQ_SUBVECTORS", "48"))
+PQ_CENTROIDS = 256  # one byte per code
+PQ_MIN_TRAIN = int(os.getenv("LOCAL_PQ_MIN_TRAIN", "4096"))
+PQ_TRAIN_SAMPLE = int(os.getenv("LOCAL_PQ_TRAIN_SAMPLE", "20000"))
+PQ_TRAIN_ITERATIONS = 20
+RESCORE_FACTOR = int(os.getenv("LOCAL_RESCORE_FACTOR", "32"))
+# Rows decoded per step while scanning codes; small enough to stay in cache
+SCAN_BLOCK = 8192
+
+VECTORS_FILE = "vectors.f32"
+TEMP_FILE_PREFIX = "vectors_"
+
+
+def top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def _nearest(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest centroid for each row"""
+    distances = (centroids ** 2).sum(axis=1) - 2 * data @ centroids.T
+    return distances.argmin(axis=1)
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int = PQ_TRAIN_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Lloyd's k-means; empty clusters are re-seeded from random rows"""
+    rng = np.random.default_rng(seed)
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    centroids = data[rng.choice(len(data), k, replace=len(data) < k)].copy()
+    for _ in range(iterations):
+        assign = _nearest(data, centroids)
+        # Cluster sums as one-hot @ data, much faster than np.add.at
+        onehot = np.zeros((k, len(data)), dtype=np.float32)
+        onehot[assign, np.arange(len(data))] = 1
+        sums = onehot @ data
+        counts = onehot.sum(axis=1)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        if not filled.all():
+            centroids[~filled] = data[rng.choice(len(data), int((~filled).sum()))]
+    return centroids
+
+
+class Float32File:
+    """Growable float32 matrix in a memory-mapped temp file, removed with the object"""
+
+    def __init__(self, dimension: int, directory: Optional[str] = None):
+        self.dimension = dimension
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix=TEMP_FILE_PREFIX, suffix=".f32", dir=directory)
+        os.close(fd)
+        weakref.finalize(self, _remove_file, self.path)
+        self.capacity = 0
+        self._map = self._open()
+
+    def _open(self):
+        if self.capacity == 0:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.memmap(self.path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dimension))
+
+    def reserve(self, capacity: int):
+        if capacity <= self.capacity:
+            return
+        self.flush()
+        self.capacity = max(capacity, 2 * self.capacity, 1024)
+        with open(self.path, "r+b") as f:
+            f.truncate(self.capacity * 4 * self.dimension)
+        self._map = self._open()
+
+    def __getitem__(self, index):
+        return self._map[index]
+
+    def __setitem__(self, index, value):
+        self._map[index] = value
+
+    def flush(self):
+        if isinstance(self._map, np.memmap):
+            self._map.flush()
+
+    def load(self, path: str) -> int:
+        """Copy a saved matrix into the file; returns its row count"""
+        saved = np.memmap(path, dtype=np.float32, mode="r").reshape(-1, self.dimension) \
+            if os.path.getsize(path) else np.empty((0, self.dimension), dtype=np.float32)
+        self.reserve(len(saved))
+        for start in range(0, len(saved), SCAN_BLOCK):
+            stop = min(start + SCAN_BLOCK, len(saved))
+            self._map[start:stop] = saved[start:stop]
+        return len(saved)
+
+    def save(self, path: str, size: int):
+        """Write the first size rows to path"""
+        with open(path, "wb") as f:
+            for start in range(0, size, SCAN_BLOCK):
+                np.asarray(self._map[start:min(start + SCAN_BLOCK, size)]).tofile(f)
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Float32Storage:
+    """Uncompressed vectors in RAM"""
+    compression = "float32"
+
+    def __init__(self, dimension: int, prefix: Optional[str] = None):
+        self.dimension = dimension
+        self._vectors = np.empty((0, dimension), dtype=np.float32)
+        if prefix:
+            self._vectors = np.fromfile(prefix + VECTORS_FILE, dtype=np.float32).reshape(-1, dimension)
+
+    def reserve(self, capacity: int):
+        if capacity > len(self._vectors):
+            grown = np.empty((max(capacity, 2 * len(self._vectors), 1024), self.dimension), dtype=np.float32)
+            grown[:len(self._vectors)] = self._vectors
+            self._vectors = grown
+
+    def put(self, positions: np.ndarray, matrix: np.ndarray, size: int):
+        self._vectors[positions] = matrix
+
+    def move(self, source: int, target: int):
+        self._vectors[target] = self._vectors[source]
+
+    def vectors(self, size: int) -> np.ndarray:
+        return self._vectors[:size]
+
+    def search(self, query: np.ndarray, k: int, size: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if rows is None:
+            return top_indices(self._vectors[:size] @ query, k)
+        return rows[top_indices(self._vectors[rows] @ query, k)]
+
+    def ram_bytes(self, size: int) -> int:
+        return size * self.dimension * 4
+
+    def save(self, prefix: str, size: int):
+        self._vectors[:size].tofile(prefix + VECTORS_FILE)
+
+
+class _CompressedStorage:
+    """Codes in RAM, float32 originals in a memory-mapped temp file for re-scoring"""
+    compression = ""
+
+    def __init__(self, dimension: int, prefix: Optional[str] = None, temp_dir: Optional[str] = None):
+        self.dimension = dimension
+        self.originals = Float32File(dimension, temp_dir)
+        if prefix:
+            self.originals.load(prefix + VECTORS_FILE)
+
+    def reserve(self, capacity: int):
+        self.originals.reserve(capacity)
+
+    def put(self, positions: np.ndarray, matrix: np.ndarray, size: int):
+        self.originals[positions] = matrix
+
+    def move(self, source: int, target: int):
+        self.originals[target] = self.originals[source]
+
+    def vectors(self, size: int) -> np.ndarray:
+        return self.originals[:size]
+
+    def _prepare(self, query: np.ndarray):
+        return query
+
+    def _score_block(self, prepared, rows) -> np.ndarray:
+        raise NotImplementedError
+
+    def _approximate(self, query: np.ndarray, size: int, rows: Optional[np.ndarray]) -> np.ndarray:
+        prepared = self._prepare(query)
+        count = size if rows is None else len(rows)
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, SCAN_BLOCK):
+            stop = min(start + SCAN_BLOCK, count)
+            block = slice(start, stop) if rows is None else rows[start:stop]
+            scores[start:stop] = self._score_block(prepared, block)
+        return scores
+
+    def search(self, query: np.ndarray, k: int, size: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        candidates = top_indices(self._approximate(query, size, rows), max(k, k * RESCORE_FACTOR))
+        if rows is not None:
+            candidates = rows[candidates]
+        # Sorted positions read the memory-mapped file front to back
+        candidates = np.sort(candidates)
+        return candidates[top_indices(self.originals[candidates] @ query, k)]
+
+    def save(self, prefix: str, size: int):
+        self.originals.save(prefix + VECTORS_FILE, size)
+
+
+class Int8Storage(_CompressedStorage):
+    """Scalar quantisation: value ~ code * scale, one scale per vector"""
+    compression = "int8"
+
+    def __init__(self, dimension: int, prefix: Optional[str] = None, temp_dir: Optional[str] = None):
+        super().__init__(dimension, prefix, temp_dir)
+        self._codes = np.empty((0, dimension), dtype=np.int8)
+        self._scales = np.empty(0, dtype=np.float32)
+        if prefix:
+            self._codes = np.load(prefix + "codes.npy")
+            self._scales = np.load(prefix + "scales.npy")
+
+    def reserve(self, capacity: int):
+        super().reserve(capacity)
+        if capacity > len(self._codes):
+            new_capacity = max(capacity, 2 * len(self._codes), 1024)
+            codes = np.empty((new_capacity, self.dimension), dtype=np.int8)
+            codes[:len(self._codes)] = self._codes
+            scales = np.empty(new_capacity, dtype=np.float32)
+            scales[:len(self._scales)] = self._scales
+            self._codes, self._scales = codes, scales
+
+    def put(self, positions: np.ndarray, matrix: np.ndarray, size: int):
+        super().put(positions, matrix, size)
+        peak = np.abs(matrix).max(axis=1)
+        scales = np.where(peak == 0, 1, peak) / 127
+        self._codes[positions] = np.rint(matrix / scales[:, None]).astype(np.int8)
+        self._scales[positions] = scales
+
+    def move(self, source: int, target: int):
+        super().move(source, target)
+        self._codes[target] = self._codes[source]
+        self._scales[target] = self._scales[source]
+
+    def _score_block(self, query, rows) -> np.ndarray:
+        return (self._codes[rows].astype(np.float32) @ query) * self._scales[rows]
+
+    def ram_bytes(self, size: int) -> int:
+        return size * (self.dimension + 4)
+
+    def save(self, prefix: str, size: int):
+        super().save(prefix, size)
+        np.save(prefix + "codes.npy", self._codes[:size])
+        np.save(prefix + "scales.npy", self._scales[:size])
+
+
+class PQStorage(_CompressedStorage):
+    """Product quantisation: each subvector is replaced by its nearest centroid's index"""
+    compression = "pq"
+
+    def __init__(self, dimension: int, prefix: Optional[str] = None, temp_dir: Optional[str] = None,
+                 subvectors: int = PQ_SUBVECTORS):
+        if dimension % subvectors:
+            raise ValueError(f"PQ subvectors ({subvectors}) must divide the dimension ({dimension})")
+        super().__init__(dimension, prefix, temp_dir)
+        self.subvectors = subvectors
+        self.subdimension = dimension // subvectors
+        # Stored per subspace, (subvectors, capacity), so a scan reads each code column contiguously
+        self._codes = np.empty((subvectors, 0), dtype=np.uint8)
+        self.codebooks: Optional[np.ndarray] = None  # (subvectors, 256, subdimension)
+        if prefix and os.path.exists(prefix + "codebooks.npy"):
+            self.codebooks = np.load(prefix + "codebooks.npy")
+            self._codes = np.load(prefix + "codes.npy")
+            self.subvectors, _, self.subdimension = self.codebooks.shape
+
+    def reserve(self, capacity: int):
+        super().reserve(capacity)
+        if capacity > self._codes.shape[1]:
+            codes = np.empty((self.subvectors, max(capacity, 2 * self._codes.shape[1], 1024)), dtype=np.uint8)
+            codes[:, :self._codes.shape[1]] = self._codes
+            self._codes = codes
+
+    def _encode(self, matrix: np.ndarray) -> np.ndarray:
+        codes = np.empty((self.subvectors, len(matrix)), dtype=np.uint8)
+        for start in range(0, len(matrix), SCAN_BLOCK):
+            block = np.asarray(matrix[start:start + SCAN_BLOCK], dtype=np.float32)
+            for j in range(self.subvectors):
+                sub = block[:, j * self.subdimension:(j + 1) * self.subdimension]
+                codes[j, start:start + len(block)] = _nearest(sub, self.codebooks[j])
+        return codes
+
+    def train(self, size: int, seed: int = 0):
+        """Fit the codebooks on (a sample of) the stored vectors and re-encode them all"""
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(size, min(size, PQ_TRAIN_SAMPLE), replace=False))
+        data = np.asarray(self.originals[sample], dtype=np.float32)
+        self.codebooks = np.stack([
+            kmeans(data[:, j * self.subdimension:(j + 1) * self.subdimension], PQ_CENTROIDS, seed=seed + j)
+            for j in range(self.subvectors)
+        ])
+        self._codes[:, :size] = self._encode(self.originals[:size])
+
+    def put(self, positions: np.ndarray, matrix: np.ndarray, size: int):
+        super().put(positions, matrix, size)
+        if self.codebooks is not None:
+            self._codes[:, positions] = self._encode(matrix)
+        elif size >= PQ_MIN_TRAIN:
+            self.train(size)
+
+    def move(self, source: int, target: int):
+        super().move(source, target)
+        self._codes[:, target] = self._codes[:, source]
+
+    def _prepare(self, query: np.ndarray) -> np.ndarray:
+        # Inner product of each query subvector with every centroid: (subvectors, 256)
+        return np.einsum("mkd,md->mk", self.codebooks, query.reshape(self.subvectors, self.subdimension))
+
+    def _score_block(self, table: np.ndarray, rows) -> np.ndarray:
+        codes = self._codes[:, rows]
+        scores = np.take(table[0], codes[0])
+        for j in range(1, self.subvectors):
+            scores += np.take(table[j], codes[j])
+        return scores
+
+    def search(self, query: np.ndarray, k: int, size: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.codebooks is None:
+            # Not trained yet: exact search over the float32 file
+            if rows is None:
+                return top_indices(self.originals[:size] @ query, k)
+            return rows[top_indices(self.originals[rows] @ query, k)]
+        return super().search(query, k, size, rows)
+
+    def ram_bytes(self, size: int) -> int:
+        codebooks = self.codebooks.nbytes if self.codebooks is not None else 0
+        return size * self.subvectors + codebooks
+
+    def save(self, prefix: str, size: int):
+        super().save(prefix, size)
+        if self.codebooks is not None:
+            np.save(prefix + "codes.npy", self._codes[:, :size])
+            np.save(prefix + "codebooks.npy", self.codebooks)
+
+
+def create_storage(compression: str, dimension: int, prefix: Optional[str] = None, temp_dir: Optional[str] = None):
+    """Storage for one shard, loaded from the files saved under prefix if given"""
+    if compression == "float32":
+        return Float32Storage(dimension, prefix)
+    if compression == "int8":
+        return Int8Storage(dimension, prefix, temp_dir)
+    if compression == "pq":
+        return PQStorage(dimension, prefix, temp_dir)
+    raise ValueError(f"Unknown vector compression: {compression}. Use one of {', '.join(COMPRESSIONS)}")
@@ -1,16 +1,29 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import time
 from services.embeddings import generate_embeddings
-from services.vectorstore_pinecone import PineconeVectorStore
-from redis_memory import RedisChatMemory  # Import the class instead
+from services.vectorstore import get_vectorstore
+from services.tenants import DEFAULT_TENANT, session_key, tenant_label, vector_namespace
+from chat_memory_base import ChatMemory
+from services.metrics import CONTEXTS_RETRIEVED, RETRIEVAL_DURATION, TOKENS, approx_tokens, stage
 
 class RAGService:
-    def __init__(self):
-        self.vectorstore = PineconeVectorStore()
+    @property
+    def vectorstore(self):
+        # Resolved per use, so importing this module does not open the store
+        # (in a pre-fork server it must be opened in the worker, not the master)
+        return get_vectorstore()
         
-    async def get_context(self, query: str, top_k: int = 3) -> List[str]:
-        """Get relevant context for query"""
-        query_embedding = await generate_embeddings([query])
-        results = await self.vectorstore.query(query_embedding[0], top_k=top_k)
+    async def get_context(self, query: str, top_k: int = 3, tenant: str = DEFAULT_TENANT,
+                          metadata_filter: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Get relevant context for query from the tenant's partition, optionally filtered by metadata"""
+        with stage("embed"):
+            query_embedding = await generate_embeddings([query])
+        start = time.perf_counter()
+        with stage("vector_query"):
+            results = await self.vectorstore.query(
+                query_embedding[0], top_k=top_k, namespace=vector_namespace(tenant), filter=metadata_filter
+            )
+        RETRIEVAL_DURATION.observe(time.perf_counter() - start, tenant=tenant_label(tenant))
         
         # Extract content from metadata
         contexts = []
@@ -47,17 +60,24 @@ Please provide a helpful answer based on the context. If the context doesn't con
         
         return prompt
     
-    async def generate_response(self, query: str, session_id: str, chat_memory: RedisChatMemory) -> Dict[str, Any]:
+    async def generate_response(self, query: str, session_id: str, chat_memory: ChatMemory,
+                                tenant: str = DEFAULT_TENANT,
+                                metadata_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate RAG response with chat memory"""
+        memory_key = session_key(tenant, session_id)
         
         # Get chat history
-        chat_history = await chat_memory.get_messages(session_id)
+        with stage("chat_history"):
+            chat_history = await chat_memory.get_messages(memory_key)
         
         # Get relevant context
-        contexts = await self.get_context(query)
+        contexts = await self.get_context(query, tenant=tenant, metadata_filter=metadata_filter)
+        CONTEXTS_RETRIEVED.inc(len(contexts), tenant=tenant_label(tenant))
         
         # Format prompt (in real scenario, you'd use an LLM here)
-        prompt = await self.format_prompt(query, contexts, chat_history)
+        with stage("prompt"):
+            prompt = await self.format_prompt(query, contexts, chat_history)
+        TOKENS.inc(approx_tokens(prompt), kind="prompt")
         
         # For demo purposes, we'll create a simple response
         # In production, you'd call an LLM API here
@@ -66,9 +86,12 @@ Please provide a helpful answer based on the context. If the context doesn't con
         else:
             response_text = "I couldn't find specific information about that in the uploaded documents. Could you please provide more details?"
         
+        TOKENS.inc(approx_tokens(response_text), kind="response")
+        
         # Store messages in memory
-        await chat_memory.add_message(session_id, "user", query)
-        await chat_memory.add_message(session_id, "assistant", response_text)
+        with stage("memory_write"):
+            await chat_memory.add_message(memory_key, "user", query)
+            await chat_memory.add_message(memory_key, "assistant", response_text)
         
         return {
             "response": response_text,
@@ -0,0 +1,139 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Tuple
+from zoneinfo import ZoneInfo
+import os
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import InterviewBooking
+
+# Slots are naive wall-clock times in BOOKING_TIMEZONE (an IANA name): dates,
+# times, business hours and stored slot_start values all use that zone
+BOOKING_TIMEZONE = ZoneInfo(os.getenv("BOOKING_TIMEZONE", "UTC"))
+
+# Bookable hours and slot length
+SLOT_MINUTES = int(os.getenv("BOOKING_SLOT_MINUTES", "30"))
+DAY_START = time.fromisoformat(os.getenv("BOOKING_DAY_START", "09:00"))
+DAY_END = time.fromisoformat(os.getenv("BOOKING_DAY_END", "17:00"))
+WEEKDAYS_ONLY = os.getenv("BOOKING_WEEKDAYS_ONLY", "true").lower() == "true"
+MAX_RANGE_DAYS = int(os.getenv("BOOKING_MAX_RANGE_DAYS", "31"))
+
+SLOT = timedelta(minutes=SLOT_MINUTES)
+
+
+class SlotUnavailableError(Exception):
+    """The requested slot is already booked"""
+
+
+def now_local() -> datetime:
+    """Current wall-clock time in BOOKING_TIMEZONE, naive like slot starts"""
+    return datetime.now(BOOKING_TIMEZONE).replace(tzinfo=None)
+
+
+def _is_bookable_day(day: date) -> bool:
+    return not WEEKDAYS_ONLY or day.weekday() < 5
+
+
+def parse_slot(date_str: str, time_str: str) -> datetime:
+    """Normalise a YYYY-MM-DD date and HH:MM time into a slot start; raises ValueError"""
+    try:
+        day = date.fromisoformat(date_str.strip())
+        start_time = time.fromisoformat(time_str.strip())
+    except ValueError:
+        raise ValueError("Use YYYY-MM-DD for date and HH:MM for time")
+    slot_start = datetime.combine(day, start_time.replace(second=0, microsecond=0))
+    day_start = datetime.combine(day, DAY_START)
+
+    if not _is_bookable_day(day):
+        raise ValueError("Interviews can only be booked on weekdays")
+    if slot_start < day_start or slot_start + SLOT > datetime.combine(day, DAY_END):
+        raise ValueError(f"Slots are between {DAY_START:%H:%M} and {DAY_END:%H:%M}")
+    if (slot_start - day_start) % SLOT:
+        raise ValueError(f"Slots start every {SLOT_MINUTES} minutes from {DAY_START:%H:%M}")
+    return slot_start
+
+
+def iter_slot_starts(start_date: date, end_date: date) -> Iterator[datetime]:
+    """Every bookable slot start between start_date and end_date (inclusive)"""
+    day = start_date
+    while day <= end_date:
+        if _is_bookable_day(day):
+            slot = datetime.combine(day, DAY_START)
+            day_end = datetime.combine(day, DAY_END)
+            while slot + SLOT <= day_end:
+                yield slot
+                slot += SLOT
+        day += timedelta(days=1)
+
+
+async def book_slot(db: AsyncSession, name: str, email: str, slot_start: datetime) -> InterviewBooking:
+    """Insert a booking; the unique index on active slots rejects double-booking atomically"""
+    interview = InterviewBooking(
+        name=name,
+        email=email,
+        date=slot_start.date().isoformat(),
+        time=slot_start.strftime("%H:%M"),
+        slot_start=slot_start,
+        status="scheduled"
+    )
+    db.add(interview)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise SlotUnavailableError(f"Slot {slot_start:%Y-%m-%d %H:%M} is already booked")
+    return interview
+
+
+def free_slots(start_date: date, end_date: date, booked: List[datetime]) -> Dict[str, List[str]]:
+    """
+    Free slots per day between start_date and end_date (inclusive).
+    booked must be sorted; each day's open interval is walked once, skipping
+    over booked intervals, so the cost is O(days + slots + bookings).
+    """
+    result = {}
+    i = 0
+    day = start_date
+    while day <= end_date:
+        if _is_bookable_day(day):
+            cursor = datetime.combine(day, DAY_START)
+            day_end = datetime.combine(day, DAY_END)
+            # Free gaps between consecutive bookings inside [cursor, day_end)
+            gaps: List[Tuple[datetime, datetime]] = []
+            while i < len(booked) and booked[i] < day_end:
+                if booked[i] >= cursor:
+                    gaps.append((cursor, booked[i]))
+                    cursor = booked[i] + SLOT
+                i += 1
+            gaps.append((cursor, day_end))
+
+            slots = []
+            for gap_start, gap_end in gaps:
+                slot = gap_start
+                while slot + SLOT <= gap_end:
+                    slots.append(slot.strftime("%H:%M"))
+                    slot += SLOT
+            result[day.isoformat()] = slots
+        day += timedelta(days=1)
+    return result
+
+
+async def get_availability(db: AsyncSession, start_date: date, end_date: date) -> Dict[str, List[str]]:
+    """Free slots over a date range using one indexed range query"""
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"Date range can span at most {MAX_RANGE_DAYS} days")
+
+    result = await db.execute(
+        select(InterviewBooking.slot_start)
+        .where(
+            InterviewBooking.status == "scheduled",
+            InterviewBooking.slot_start >= datetime.combine(start_date, time.min),
+            InterviewBooking.slot_start < datetime.combine(end_date + timedelta(days=1), time.min)
+        )
+        .order_by(InterviewBooking.slot_start)
+    )
+    return free_slots(start_date, end_date, list(result.scalars()))
@@ -0,0 +1,155 @@
+"""
+Tenant scoping.
+
+Callers name their tenant with the X-Tenant-ID header; requests without it
+belong to DEFAULT_TENANT. A tenant's documents carry its tenant_id, its
+vectors live in their own vector store namespace and its chat sessions are
+keyed under it, so retrieval only searches the caller's partition.
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+DEFAULT_TENANT = "default"
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+# Separates tenant and session in chat memory keys, so session ids may not contain it
+SESSION_KEY_SEPARATOR = ":"
+
+# Per-tenant limits, 0 means unlimited. Checked against the tenant_usage totals
+# committed so far, so concurrent uploads of one tenant can overshoot by one
+# request each.
+TENANT_MAX_DOCUMENTS = int(os.getenv("TENANT_MAX_DOCUMENTS", "0"))
+TENANT_MAX_VECTORS = int(os.getenv("TENANT_MAX_VECTORS", "0"))
+
+# Tenants reported by name in metric labels (comma-separated). The header is
+# unauthenticated, so every other tenant is reported as "other" to keep the
+# number of series bounded.
+METRICS_TENANTS = frozenset(filter(None, (t.strip() for t in os.getenv("METRICS_TENANTS", "").split(","))))
+OTHER_TENANT_LABEL = "other"
+
+
+class QuotaExceeded(Exception):
+    """A tenant would go over TENANT_MAX_DOCUMENTS or TENANT_MAX_VECTORS"""
+
+    def __init__(self, tenant: str, quota: str, limit: int):
+        self.tenant = tenant
+        self.quota = quota
+        super().__init__(f"Tenant '{tenant}' would exceed its {quota} quota of {limit}")
+
+
+@dataclass
+class TenantUsage:
+    documents: int
+    vectors: int
+
+
+async def get_tenant(x_tenant_id: Optional[str] = Header(None)) -> str:
+    """FastAPI dependency: the caller's tenant from the X-Tenant-ID header"""
+    if not x_tenant_id:
+        return DEFAULT_TENANT
+    if not TENANT_ID_PATTERN.match(x_tenant_id):
+        raise HTTPException(status_code=400, detail="Invalid X-Tenant-ID header")
+    return x_tenant_id
+
+
+def tenant_label(tenant: str) -> str:
+    """Metric label value of a tenant: its name if configured, else OTHER_TENANT_LABEL"""
+    if tenant == DEFAULT_TENANT or tenant in METRICS_TENANTS:
+        return tenant
+    return OTHER_TENANT_LABEL
+
+
+def vector_namespace(tenant: str) -> str:
+    """Vector store namespace of a tenant; the default tenant keeps the default namespace"""
+    return "" if tenant == DEFAULT_TENANT else tenant
+
+
+def check_session_id(session_id: str) -> str:
+    """Reject session ids that could name another tenant's chat memory key (400)"""
+    if SESSION_KEY_SEPARATOR in session_id:
+        raise HTTPException(status_code=400, detail=f"session_id may not contain '{SESSION_KEY_SEPARATOR}'")
+    return session_id
+
+
+def session_key(tenant: str, session_id: str) -> str:
+    """Chat memory key of a session; default tenant keys are unchanged.
+
+    Other tenants' keys are "<tenant>:<session_id>", which cannot collide with a
+    default key as long as session ids never contain the separator.
+    """
+    if SESSION_KEY_SEPARATOR in session_id:
+        raise ValueError(f"session_id may not contain '{SESSION_KEY_SEPARATOR}'")
+    if tenant == DEFAULT_TENANT:
+        return session_id
+    return f"{tenant}{SESSION_KEY_SEPARATOR}{session_id}"
+
+
+def quotas_enabled() -> bool:
+    return bool(TENANT_MAX_DOCUMENTS or TENANT_MAX_VECTORS)
+
+
+async def get_usage(db, tenant: str) -> TenantUsage:
+    """Documents and vectors (chunks) stored by a tenant; no query when quotas are off"""
+    from sqlalchemy import select
+    from models import TenantUsageCount
+
+    if not quotas_enabled():
+        return TenantUsage(documents=0, vectors=0)
+    result = await db.execute(
+        select(TenantUsageCount.documents, TenantUsageCount.vectors)
+        .where(TenantUsageCount.tenant_id == tenant)
+    )
+    row = result.first()
+    if row is None:
+        return TenantUsage(documents=0, vectors=0)
+    return TenantUsage(documents=row.documents, vectors=row.vectors)
+
+
+async def add_usage(db, tenant: str, documents: int, vectors: int):
+    """Adjust a tenant's usage totals inside the caller's transaction.
+
+    Called alongside every document insert and delete (also with quotas off,
+    so the totals are right when they are turned on).
+    """
+    from sqlalchemy import update
+    from sqlalchemy.exc import IntegrityError
+    from models import TenantUsageCount
+
+    statement = (
+        update(TenantUsageCount)
+        .where(TenantUsageCount.tenant_id == tenant)
+        .values(documents=TenantUsageCount.documents + documents, vectors=TenantUsageCount.vectors + vectors)
+    )
+    if (await db.execute(statement)).rowcount:
+        return
+    try:
+        async with db.begin_nested():
+            db.add(TenantUsageCount(tenant_id=tenant, documents=documents, vectors=vectors))
+    except IntegrityError:
+        # Another request created the row first
+        await db.execute(statement)
+
+
+def seed_usage(sync_conn):
+    """Fill a new tenant_usage table from the documents already stored"""
+    from sqlalchemy import func, insert, select
+    from models import Document, TenantUsageCount
+
+    totals = (
+        select(Document.tenant_id, func.count(), func.coalesce(func.sum(Document.num_chunks), 0))
+        .group_by(Document.tenant_id)
+    )
+    sync_conn.execute(
+        insert(TenantUsageCount).from_select(["tenant_id", "documents", "vectors"], totals)
+    )
+
+
+def check_quota(tenant: str, usage: TenantUsage, new_documents: int = 0, new_vectors: int = 0):
+    """Raise QuotaExceeded if adding to usage would pass a tenant limit"""
+    if TENANT_MAX_DOCUMENTS and usage.documents + new_documents > TENANT_MAX_DOCUMENTS:
+        raise QuotaExceeded(tenant, "documents", TENANT_MAX_DOCUMENTS)
+    if TENANT_MAX_VECTORS and usage.vectors + new_vectors > TENANT_MAX_VECTORS:
+        raise QuotaExceeded(tenant, "vectors", TENANT_MAX_VECTORS)
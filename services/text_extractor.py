@@ -1,36 +1,33 @@
-from typing import Optional
-from pypdf import PdfReader
-import asyncio
-import os
+from typing import BinaryIO, Union
+import codecs
+import io
 
+from services.admission import run_blocking
 
-async def extract_text_from_file(path:str) -> str:
-    
+
+def make_text_decoder() -> io.IncrementalNewlineDecoder:
     """
-    Detect file type by extension and extract text.
-    Supports .pdf and .txt only
+    Incremental decoder producing the same text as reading the file with
+    open(path, "r", encoding="utf-8", errors="ignore"): multi-byte sequences
+    and \r\n pairs split across chunks are handled, newlines are translated.
     """
+    return io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder("utf-8")(errors="ignore"), translate=True
+    )
 
-    if path.lower().endswith(".txt"):
 
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _read_txt_sync, path)
-    if path.lower().endswith(".pdf"):
-        return await asyncio.get_event_loop().run_in_executor(None, _read_pdf_sync, path)
-    
-    return ""
 
+async def extract_text_from_pdf(source: Union[str, BinaryIO]) -> str:
+    """Extract the text of a PDF given as a path or a binary file object (e.g. a spooled upload)"""
+    return await run_blocking(_read_pdf_sync, source)
 
 
-def _read_txt_sync(path: str) -> str:
-    with open(path, "r",encoding="utf-8", errors="ignore") as f:
-        return f.read()
-    
 
+def _read_pdf_sync(source: Union[str, BinaryIO]) -> str:
+    from pypdf import PdfReader
 
-def _read_pdf_sync(path: str) -> str:
     try:
-        reader = PdfReader(path)
+        reader = PdfReader(source)
         texts = []
         for page in reader.pages:
             texts.append(page.extract_text()or "")
@@ -0,0 +1,100 @@
+"""
+Streaming upload handling.
+
+Starlette's multipart parser has already spooled each file of the request
+to a SpooledTemporaryFile (in memory up to 1 MB, then on disk) before the
+endpoint runs, so that copy is used in place: upload bodies are read from it
+in fixed-size chunks while being hashed, either straight through the text
+decoder (for .txt) or only to size-check and hash it before it is rewound and
+parsed where it is (for PDF). The raw body is never held in memory as a
+whole and never copied a second time. UPLOAD_MAX_BYTES is therefore checked
+after the parse; UPLOAD_MAX_REQUEST_BYTES (checked against Content-Length
+before the parse) bounds what gets spooled.
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Optional
+
+from fastapi import UploadFile
+
+from services.metrics import stage
+from services.text_extractor import make_text_decoder
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+
+class UploadTooLarge(Exception):
+    """Upload exceeds UPLOAD_MAX_BYTES"""
+
+    def __init__(self, limit: int = UPLOAD_MAX_BYTES):
+        super().__init__(f"File exceeds the {limit} byte upload limit")
+
+
+@dataclass
+class SpooledUpload:
+    file: BinaryIO  # Starlette's spooled copy of the body, rewound
+    size: int
+    sha256: str
+
+
+def _check_declared_size(file: UploadFile, max_bytes: int):
+    # Reject before reading when the size is already known
+    size: Optional[int] = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+
+async def _iter_chunks(file: UploadFile, max_bytes: int, digest) -> AsyncIterator[bytes]:
+    """Body chunks, hashed on the way; raises UploadTooLarge as soon as the limit is passed"""
+    _check_declared_size(file, max_bytes)
+    total = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        digest.update(chunk)
+        yield chunk
+
+
+class TextStream:
+    """
+    Decoded text of a .txt upload as an async iterator of pieces, one per body
+    chunk, without writing it to disk. size and sha256 are set once the
+    iteration has finished.
+    """
+
+    def __init__(self, file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES):
+        self.file = file
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.sha256: Optional[str] = None
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        digest = hashlib.sha256()
+        decoder = make_text_decoder()
+        async for chunk in _iter_chunks(self.file, self.max_bytes, digest):
+            self.size += len(chunk)
+            with stage("extract"):
+                piece = decoder.decode(chunk)
+            if piece:
+                yield piece
+        piece = decoder.decode(b"", final=True)
+        if piece:
+            yield piece
+        self.sha256 = digest.hexdigest()
+
+
+async def read_spooled_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    """Size-check and hash an upload in its spooled file, then rewind it for parsing in place"""
+    digest = hashlib.sha256()
+    size = 0
+    with stage("file_read"):
+        async for chunk in _iter_chunks(file, max_bytes, digest):
+            size += len(chunk)
+        await file.seek(0)
+    return SpooledUpload(file=file.file, size=size, sha256=digest.hexdigest())
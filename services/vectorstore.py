@@ -0,0 +1,37 @@
+import os
+from typing import Optional
+
+from services.vectorstore_base import VectorStore
+
+# "pinecone" (default) or "local" (in-process, for single-node deployments and offline runs)
+VECTOR_STORE_BACKEND = os.environ.get("VECTOR_STORE_BACKEND", "pinecone")
+
+_vectorstore: Optional[VectorStore] = None
+
+
+def create_vectorstore(backend: str = VECTOR_STORE_BACKEND) -> VectorStore:
+    """Create the vector store selected by name"""
+    backend = backend.lower()
+    if backend == "pinecone":
+        from services.vectorstore_pinecone import PineconeVectorStore
+        return PineconeVectorStore()
+    if backend == "local":
+        from services.vectorstore_local import LocalVectorStore
+        return LocalVectorStore()
+    raise ValueError(f"Unknown vector store backend: {backend}. Use 'pinecone' or 'local'")
+
+
+def get_vectorstore() -> VectorStore:
+    """Shared vector store used by ingestion and retrieval"""
+    global _vectorstore
+    if _vectorstore is None:
+        _vectorstore = create_vectorstore()
+    return _vectorstore
+
+
+async def close_vectorstore():
+    """Close the shared vector store if one was created"""
+    global _vectorstore
+    if _vectorstore is not None:
+        await _vectorstore.close()
+        _vectorstore = None
@@ -1,11 +1,23 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from abc import ABC, abstractmethod
 
 class VectorStore(ABC):
+    """Vectors are partitioned by namespace ("" is the default namespace).
+    Query filters use Pinecone's metadata filter syntax (see services.filters)."""
+
+    @abstractmethod
+    async def add_vectors(self, vectors: List[List[float]], metadata: List[Dict[str, Any]], ids: List[str], namespace: str = "") -> None:
+        pass
+
     @abstractmethod
-    async def add_vectors(self, vectors: List[List[float]], metadata: List[Dict[str, Any]], ids: List[str]) -> None:
+    async def query(self, vector: List[float], top_k: int = 5, namespace: str = "",
+                    filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         pass
 
     @abstractmethod
-    async def query(self, vector: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    async def delete_vectors(self, ids: List[str], namespace: str = "") -> None:
+        pass
+
+    async def close(self) -> None:
+        """Release resources / persist state on shutdown"""
         pass
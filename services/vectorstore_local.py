@@ -0,0 +1,441 @@
+"""
+In-process vector store, sharded by namespace.
+
+Each shard keeps its vectors in one of the storages from services.quantization
+(float32, int8 or pq; LOCAL_VECTOR_COMPRESSION, overridable per namespace with
+LOCAL_VECTOR_COMPRESSION_BY_NAMESPACE="tenant_a=pq,tenant_b=int8"). With
+LOCAL_VECTOR_DIR set, shards are loaded from that directory and saved to it
+every LOCAL_VECTOR_SAVE_INTERVAL seconds (changed shards only) and on close,
+by one process at a time (a lock file refuses a second one), and can be
+converted offline:
+
+    python -m services.vectorstore_local stats
+    python -m services.vectorstore_local rebuild --compression pq [--namespace acme]
+"""
+import argparse
+import json
+import os
+import threading
+from typing import List, Dict, Any, Optional
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks
+    fcntl = None
+
+from services.vectorstore_base import VectorStore
+from services.admission import run_blocking
+from services.filters import MetadataIndex
+from services.quantization import COMPRESSIONS, TEMP_FILE_PREFIX, create_storage
+
+DIMENSION = int(os.environ.get("LOCAL_VECTOR_DIMENSION", "384"))
+LOCAL_VECTOR_COMPRESSION = os.environ.get("LOCAL_VECTOR_COMPRESSION", "float32")
+LOCAL_VECTOR_COMPRESSION_BY_NAMESPACE = os.environ.get("LOCAL_VECTOR_COMPRESSION_BY_NAMESPACE", "")
+LOCAL_VECTOR_DIR = os.environ.get("LOCAL_VECTOR_DIR", "")
+# Seconds between background saves of changed shards (0: only on close)
+LOCAL_VECTOR_SAVE_INTERVAL = float(os.environ.get("LOCAL_VECTOR_SAVE_INTERVAL", "60"))
+# Where compressed shards keep their float32 re-scoring files; default
+# LOCAL_VECTOR_DIR/tmp, or the system temp dir for an in-memory store
+LOCAL_VECTOR_TMP_DIR = os.environ.get("LOCAL_VECTOR_TMP_DIR", "")
+
+SHARD_FILE = "shard.json"
+ENTRIES_FILE = "entries.jsonl"
+LOCK_FILE = ".lock"
+TEMP_DIRNAME = "tmp"
+
+
+def _parse_overrides(value: str) -> Dict[str, str]:
+    overrides = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        namespace, _, compression = item.partition("=")
+        overrides[namespace.strip()] = compression.strip()
+    return overrides
+
+
+def _shard_dirname(namespace: str) -> str:
+    return "ns-" + quote(namespace, safe="")
+
+
+def _fsync(path: str):
+    """Flush a file or directory entry to disk"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _lock_directory(path: str):
+    """Open and exclusively lock the store's lock file; fails if another process holds it"""
+    handle = open(os.path.join(path, LOCK_FILE), "w")
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            raise RuntimeError(f"Vector store directory {path} is in use by another process; "
+                               f"LOCAL_VECTOR_DIR supports a single worker")
+    return handle
+
+
+class _Shard:
+    """Vectors of one namespace: vector storage plus ids, metadata and a metadata index.
+
+    A persisted shard only changes its directory in save(), which writes a new
+    generation of files ("<generation>-entries.jsonl", "<generation>-vectors.f32",
+    ...) and then points shard.json at it, so a crash leaves the last complete save.
+    """
+
+    def __init__(self, dimension: int, compression: str = "float32", directory: Optional[str] = None,
+                 temp_dir: Optional[str] = None):
+        self.dimension = dimension
+        self.directory = directory
+        self.temp_dir = temp_dir
+        self._generation = 0
+        self._dirty = False  # changed since the last save
+        self._size = 0
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._metadata: List[Dict[str, Any]] = []
+        self._index = MetadataIndex()
+        self._lock = threading.Lock()
+        if directory and os.path.exists(os.path.join(directory, SHARD_FILE)):
+            with open(os.path.join(directory, SHARD_FILE)) as f:
+                state = json.load(f)
+            if state["dimension"] != dimension:
+                raise ValueError(f"Shard {directory} has dimension {state['dimension']}, expected {dimension}")
+            if state["compression"] != compression:
+                print(f"⚠️ Shard {directory} is stored as {state['compression']}, not {compression}; "
+                      f"run 'python -m services.vectorstore_local rebuild' to convert it")
+            compression = state["compression"]
+            self._generation = state["generation"]
+            self._load_entries(state["size"])
+        elif directory:
+            os.makedirs(directory, exist_ok=True)
+        self._storage = create_storage(compression, dimension,
+                                       self._prefix(self._generation) if self._size else None, temp_dir)
+
+    @property
+    def compression(self) -> str:
+        return self._storage.compression
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _prefix(self, generation: int) -> str:
+        return os.path.join(self.directory, f"{generation}-")
+
+    def _load_entries(self, size: int):
+        with open(self._prefix(self._generation) + ENTRIES_FILE) as f:
+            for position, line in enumerate(f):
+                entry = json.loads(line)
+                self._ids.append(entry["id"])
+                self._positions[entry["id"]] = position
+                self._metadata.append(entry["metadata"])
+                self._index.add(position, entry["metadata"])
+        if len(self._ids) != size:
+            raise ValueError(f"Shard {self.directory} lists {len(self._ids)} entries, expected {size}")
+        self._size = size
+
+    def add(self, matrix: np.ndarray, metadata: List[Dict[str, Any]], ids: List[str]):
+        with self._lock:
+            self._storage.reserve(self._size + len(ids))
+            positions = np.empty(len(ids), dtype=np.intp)
+            for i, (vector_id, meta) in enumerate(zip(ids, metadata)):
+                position = self._positions.get(vector_id)
+                if position is None:
+                    position = self._size
+                    self._size += 1
+                    self._positions[vector_id] = position
+                    self._ids.append(vector_id)
+                    self._metadata.append(meta)
+                else:
+                    self._index.remove(position, self._metadata[position])
+                    self._metadata[position] = meta
+                self._index.add(position, meta)
+                positions[i] = position
+            self._storage.put(positions, matrix, self._size)
+            self._dirty = True
+
+    def query(self, query: np.ndarray, top_k: int, metadata_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._size == 0 or top_k <= 0:
+                return []
+            rows = None
+            if metadata_filter:
+                # Score only the rows the filter selects
+                selected = self._index.select(metadata_filter, self._metadata, self._size)
+                if not selected:
+                    return []
+                rows = np.fromiter(selected, dtype=np.intp, count=len(selected))
+            top = self._storage.search(query, top_k, self._size, rows)
+            return [self._metadata[i] for i in top]
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            for vector_id in ids:
+                position = self._positions.pop(vector_id, None)
+                if position is None:
+                    continue
+                self._index.remove(position, self._metadata[position])
+                # Move the last row into the gap to keep the matrix dense
+                last = self._size - 1
+                if position != last:
+                    self._storage.move(last, position)
+                    self._ids[position] = self._ids[last]
+                    self._metadata[position] = self._metadata[last]
+                    self._positions[self._ids[position]] = position
+                    self._index.move(last, position, self._metadata[position])
+                self._ids.pop()
+                self._metadata.pop()
+                self._size = last
+                self._dirty = True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "compression": self.compression,
+                "vectors": self._size,
+                "ram_bytes": self._storage.ram_bytes(self._size),
+                "ram_bytes_per_vector": round(self._storage.ram_bytes(self._size) / max(self._size, 1), 1)
+            }
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def save(self):
+        """Write a new generation of entries, vectors and codes, then switch shard.json to it.
+
+        Every new file and the directory are fsynced before shard.json is
+        replaced, and again before older generations are removed, so even a
+        power loss leaves shard.json pointing at complete files.
+        """
+        with self._lock:
+            generation = self._generation + 1
+            prefix = self._prefix(generation)
+            self._storage.save(prefix, self._size)
+            with open(prefix + ENTRIES_FILE, "w") as f:
+                for vector_id, meta in zip(self._ids, self._metadata):
+                    f.write(json.dumps({"id": vector_id, "metadata": meta}) + "\n")
+            for name in os.listdir(self.directory):
+                if name.startswith(f"{generation}-"):
+                    _fsync(os.path.join(self.directory, name))
+            state = {"dimension": self.dimension, "compression": self.compression,
+                     "size": self._size, "generation": generation}
+            path = os.path.join(self.directory, SHARD_FILE)
+            with open(path + ".tmp", "w") as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            _fsync(self.directory)
+            os.replace(path + ".tmp", path)
+            _fsync(self.directory)
+            self._generation = generation
+            self._dirty = False
+            # Older generations, and files of a save that crashed half-way
+            for name in os.listdir(self.directory):
+                if name != SHARD_FILE and not name.startswith(f"{generation}-"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def rebuild(self, compression: str):
+        """Re-encode every vector into a storage of the given compression (retrains PQ).
+
+        The new storage is filled before it replaces the current one, and the
+        shard directory only changes on the next save().
+        """
+        with self._lock:
+            storage = create_storage(compression, self.dimension, temp_dir=self.temp_dir)
+            storage.reserve(self._size)
+            if self._size:
+                vectors = np.array(self._storage.vectors(self._size), dtype=np.float32)
+                storage.put(np.arange(self._size), vectors, self._size)
+            self._storage = storage
+            self._dirty = True
+
+
+class LocalVectorStore(VectorStore):
+    """Exact cosine-similarity search over vectors held in process memory.
+
+    Vectors are normalised on insert and kept in one growing float32 matrix
+    per namespace, so a query is a single matrix-vector product over the
+    caller's shard plus a partial sort, and shards do not block each other.
+    Filtered queries resolve the filter through the shard's MetadataIndex and
+    only score the selected rows. Shards may store quantised vectors instead
+    (see services.quantization), trading a float32 re-score of the top
+    candidates for several times less RAM per vector.
+    """
+
+    def __init__(self, dimension: int = DIMENSION, compression: str = LOCAL_VECTOR_COMPRESSION,
+                 data_dir: Optional[str] = LOCAL_VECTOR_DIR or None,
+                 compression_by_namespace: Optional[Dict[str, str]] = None,
+                 save_interval: float = LOCAL_VECTOR_SAVE_INTERVAL,
+                 temp_dir: Optional[str] = LOCAL_VECTOR_TMP_DIR or None):
+        self.dimension = dimension
+        self.compression = compression
+        self.compression_by_namespace = (
+            _parse_overrides(LOCAL_VECTOR_COMPRESSION_BY_NAMESPACE)
+            if compression_by_namespace is None else compression_by_namespace
+        )
+        for mode in [compression, *self.compression_by_namespace.values()]:
+            if mode not in COMPRESSIONS:
+                raise ValueError(f"Unknown vector compression: {mode}. Use one of {', '.join(COMPRESSIONS)}")
+        self.data_dir = data_dir
+        self.temp_dir = temp_dir or (os.path.join(data_dir, TEMP_DIRNAME) if data_dir else None)
+        self._shards: Dict[str, _Shard] = {}
+        self._lock = threading.Lock()
+        self._directory_lock = None
+        # Process that owns data_dir; a forked copy of the store must not write it
+        self._pid = os.getpid()
+        self._closed = threading.Event()
+        if data_dir:
+            self._load()
+            if save_interval > 0:
+                threading.Thread(target=self._save_periodically, args=(save_interval,),
+                                 name="vectorstore-saver", daemon=True).start()
+
+    def _load(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._directory_lock = _lock_directory(self.data_dir)
+        self._remove_stale_temp_files()
+        for name in sorted(os.listdir(self.data_dir)):
+            if name.startswith("ns-") and os.path.isdir(os.path.join(self.data_dir, name)):
+                namespace = unquote(name[3:])
+                self._shards[namespace] = self._new_shard(namespace)
+
+    def _remove_stale_temp_files(self):
+        """Temp files in the store's own tmp dir left by a process that crashed"""
+        directory = os.path.join(self.data_dir, TEMP_DIRNAME)
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.startswith(TEMP_FILE_PREFIX):
+                    os.remove(os.path.join(directory, name))
+
+    def _new_shard(self, namespace: str) -> _Shard:
+        directory = os.path.join(self.data_dir, _shard_dirname(namespace)) if self.data_dir else None
+        return _Shard(self.dimension, self.compression_for(namespace), directory, self.temp_dir)
+
+    def compression_for(self, namespace: str) -> str:
+        """Configured compression of a namespace's shard"""
+        return self.compression_by_namespace.get(namespace, self.compression)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in list(self._shards.values()))
+
+    def namespaces(self) -> Dict[str, int]:
+        """Vector count per namespace"""
+        return {namespace: len(shard) for namespace, shard in list(self._shards.items())}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Compression, vector count and RAM used by vectors, per namespace"""
+        return {namespace: shard.stats() for namespace, shard in list(self._shards.items())}
+
+    def _check_owner(self):
+        if self.data_dir and os.getpid() != self._pid:
+            raise RuntimeError(f"Vector store directory {self.data_dir} belongs to process {self._pid}; "
+                               f"LOCAL_VECTOR_DIR supports a single worker")
+
+    def save(self):
+        """Persist every shard changed since its last save to data_dir"""
+        if not self.data_dir:
+            raise ValueError("LocalVectorStore has no data_dir to save to")
+        self._check_owner()
+        for shard in list(self._shards.values()):
+            if shard.dirty:
+                shard.save()
+
+    def _save_periodically(self, interval: float):
+        while not self._closed.wait(interval):
+            try:
+                self.save()
+            except Exception as e:
+                print(f"⚠️ Saving vector store to {self.data_dir} failed: {e}")
+
+    def rebuild(self, compression: Optional[str] = None, namespace: Optional[str] = None):
+        """Convert shards (all, or one namespace) to a compression, by default the configured one"""
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown vector compression: {compression}. Use one of {', '.join(COMPRESSIONS)}")
+        for name, shard in list(self._shards.items()):
+            if namespace is None or name == namespace:
+                shard.rebuild(compression or self.compression_for(name))
+
+    def _shard(self, namespace: str, create: bool = False):
+        shard = self._shards.get(namespace)
+        if shard is None and create:
+            with self._lock:
+                shard = self._shards.get(namespace)
+                if shard is None:
+                    shard = self._shards[namespace] = self._new_shard(namespace)
+        return shard
+
+    def _add_sync(self, vectors: List[List[float]], metadata: List[Dict[str, Any]], ids: List[str], namespace: str = ""):
+        self._check_owner()
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dimension)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+        self._shard(namespace, create=True).add(matrix, metadata, ids)
+
+    def _query_sync(self, vector: List[float], top_k: int, namespace: str = "",
+                    filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        shard = self._shard(namespace)
+        if shard is None:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+        return shard.query(query, top_k, filter)
+
+    def _delete_sync(self, ids: List[str], namespace: str = ""):
+        self._check_owner()
+        shard = self._shard(namespace)
+        if shard is not None:
+            shard.delete(ids)
+
+    async def add_vectors(
+        self, vectors: List[List[float]], metadata: List[Dict[str, Any]], ids: List[str], namespace: str = ""
+    ) -> None:
+        """Add or overwrite vectors in a namespace"""
+        await run_blocking(self._add_sync, vectors, metadata, ids, namespace)
+
+    async def query(self, vector: List[float], top_k: int = 5, namespace: str = "",
+                    filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Return metadata of the top_k most similar vectors in a namespace matching filter"""
+        return await run_blocking(self._query_sync, vector, top_k, namespace, filter)
+
+    async def delete_vectors(self, ids: List[str], namespace: str = "") -> None:
+        """Delete vectors by id from a namespace"""
+        await run_blocking(self._delete_sync, ids, namespace)
+
+    async def close(self) -> None:
+        """Save the shards when the store is persisted and release data_dir"""
+        self._closed.set()
+        if self.data_dir and self._directory_lock is not None and os.getpid() == self._pid:
+            await run_blocking(self.save)
+            self._directory_lock.close()
+            self._directory_lock = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("stats", "rebuild"))
+    parser.add_argument("--dir", default=LOCAL_VECTOR_DIR, help="store directory (default: LOCAL_VECTOR_DIR)")
+    parser.add_argument("--compression", choices=COMPRESSIONS, help="target compression (default: configured)")
+    parser.add_argument("--namespace", help="only this namespace ('' is the default one)")
+    args = parser.parse_args(argv)
+    if not args.dir:
+        parser.error("--dir or LOCAL_VECTOR_DIR is required")
+
+    store = LocalVectorStore(data_dir=args.dir)
+    if args.command == "rebuild":
+        store.rebuild(args.compression, args.namespace)
+        store.save()
+    for namespace, stats in sorted(store.stats().items()):
+        print(f"{namespace or '(default)':<24}{stats['compression']:<10}{stats['vectors']:>10} vectors"
+              f"{stats['ram_bytes_per_vector']:>10} B/vector")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,20 @@
 
 
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from services.vectorstore_base import VectorStore
-from pinecone import Pinecone, ServerlessSpec
+from services.admission import run_blocking
 import asyncio
 
-INDEX_NAME = "backend"
+INDEX_NAME = os.environ.get("PINECONE_INDEX_NAME", "backend")
+# Vectors per upsert request; Pinecone caps request size, so large batches are split
+UPSERT_BATCH_SIZE = int(os.environ.get("PINECONE_UPSERT_BATCH_SIZE", "100"))
+# Pinecone accepts at most 1000 ids per delete
+DELETE_BATCH_SIZE = 1000
 
 def init_pinecone():
+    from pinecone import Pinecone, ServerlessSpec
+
     api_key = os.environ.get("PINECONE_API_KEY")
     if not api_key:
         raise ValueError("PINECONE_API_KEY is not set")
@@ -33,23 +39,44 @@ class PineconeVectorStore(VectorStore):
     _index = None  # class-level shared index
 
     def __init__(self):
+        self.index  # connect eagerly so configuration errors surface at startup
+
+    @property
+    def index(self):
+        # Resolved on every use so a forked worker can drop the parent's client (reset_index)
         if PineconeVectorStore._index is None:
             PineconeVectorStore._index = init_pinecone()
-        self.index = PineconeVectorStore._index
+        return PineconeVectorStore._index
+
+    @classmethod
+    def reset_index(cls):
+        """Forget the shared client; the next use reconnects"""
+        cls._index = None
 
     async def add_vectors(
-        self, vectors: List[List[float]], metadata: List[Dict[str, Any]], ids: List[str]
+        self, vectors: List[List[float]], metadata: List[Dict[str, Any]], ids: List[str], namespace: str = ""
     ) -> None:
-        """Add vectors to Pinecone index"""
+        """Add vectors to a namespace of the Pinecone index"""
         items = [{"id": ids[i], "values": vectors[i], "metadata": metadata[i]} for i in range(len(ids))]
-        await asyncio.to_thread(self.index.upsert, vectors=items)
+        batches = [items[i:i + UPSERT_BATCH_SIZE] for i in range(0, len(items), UPSERT_BATCH_SIZE)]
+        await asyncio.gather(*(
+            run_blocking(self.index.upsert, vectors=batch, namespace=namespace) for batch in batches
+        ))
 
-    async def query(self, vector: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
-        """Query Pinecone index for top_k similar vectors"""
-        res = await asyncio.to_thread(
+    async def query(self, vector: List[float], top_k: int = 5, namespace: str = "",
+                    filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Query one namespace of the Pinecone index for top_k similar vectors; filter is passed through"""
+        res = await run_blocking(
             self.index.query,
             vector=vector,
             top_k=top_k,
+            namespace=namespace,
+            filter=filter or None,
             include_metadata=True
         )
         return [match["metadata"] for match in res["matches"]]
+
+    async def delete_vectors(self, ids: List[str], namespace: str = "") -> None:
+        """Delete vectors by id from a namespace"""
+        batches = [ids[i:i + DELETE_BATCH_SIZE] for i in range(0, len(ids), DELETE_BATCH_SIZE)]
+        await asyncio.gather(*(run_blocking(self.index.delete, ids=batch, namespace=namespace) for batch in batches))
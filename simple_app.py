@@ -1,6 +1,9 @@
 from fastapi import FastAPI, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
+import os
+
+from local_memory import InMemoryChatMemory
+from server import run
 
 app = FastAPI(
     title="Simple RAG API",
@@ -19,7 +22,7 @@ app.add_middleware(
 
 # Simple in-memory storage
 documents = []
-chats = {}
+chats = InMemoryChatMemory()
 
 @app.get("/")
 async def root():
@@ -69,12 +72,8 @@ async def chat(message: str, session_id: str = "default"):
     Simple chat that definitely works
     """
     try:
-        # Initialize session if new
-        if session_id not in chats:
-            chats[session_id] = []
-        
         # Add user message
-        chats[session_id].append({"role": "user", "content": message})
+        await chats.add_message(session_id, "user", message)
         
         # Simple response logic
         if "hello" in message.lower() or "hi" in message.lower():
@@ -88,7 +87,7 @@ async def chat(message: str, session_id: str = "default"):
             response = f"I understand: '{message}'. How can I assist you?"
         
         # Add assistant response
-        chats[session_id].append({"role": "assistant", "content": response})
+        await chats.add_message(session_id, "assistant", response)
         
         return {
             "success": True,
@@ -111,7 +110,7 @@ async def list_documents():
 
 @app.get("/chat/history/{session_id}")
 async def get_history(session_id: str):
-    history = chats.get(session_id, [])
+    history = await chats.get_messages(session_id, limit=0)
     return {
         "session_id": session_id,
         "history": history
@@ -121,4 +120,5 @@ if __name__ == "__main__":
     print("🚀 Starting server on http://localhost:8000")
     print("📚 API docs: http://localhost:8000/docs")
     print("⏹️  Press CTRL+C to stop the server")
-    uvicorn.run("simple_app:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # One worker: documents and chats live in this process
+    run("simple_app:app", port=8000, workers=1, reload=os.getenv("RELOAD", "false").lower() == "true")
\ No newline at end of file
@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Offline defaults: in-process vector store and chat memory, no Pinecone/Redis,
+# and a throwaway SQLite database instead of ./backend.db
+os.environ.setdefault("VECTOR_STORE_BACKEND", "local")
+os.environ.setdefault("CHAT_MEMORY_BACKEND", "memory")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    """TestClient for the full app with the benchmark suite's deterministic embedder"""
+    from fastapi.testclient import TestClient
+
+    from benchmarks.fakes import StubEmbedder
+    from main import app
+    from services import embeddings
+
+    monkeypatch.setattr(embeddings, "_model", StubEmbedder())
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from local_memory import InMemoryChatMemory, SQLiteChatMemory
+
+BACKENDS = ["memory", "sqlite", "redis"]
+
+
+def make_memory(backend, tmp_path, max_messages):
+    if backend == "memory":
+        return InMemoryChatMemory(max_messages=max_messages)
+    if backend == "sqlite":
+        return SQLiteChatMemory(path=str(tmp_path / "chat_memory.db"), max_messages=max_messages)
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis_memory import RedisChatMemory
+
+    memory = RedisChatMemory(max_messages=max_messages)
+    memory.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return memory
+
+
+def run(backend, tmp_path, body, max_messages=5):
+    """Run body(memory) against a fresh backend in its own event loop"""
+    memory = make_memory(backend, tmp_path, max_messages)
+
+    async def main():
+        await memory.connect()
+        try:
+            return await body(memory)
+        finally:
+            await memory.disconnect()
+
+    return asyncio.run(main())
+
+
+async def add(memory, session_id, count, start=0):
+    for i in range(start, start + count):
+        await memory.add_message(session_id, "user" if i % 2 == 0 else "assistant", f"m{i}")
+
+
+async def contents(memory, session_id, limit=10):
+    return [message["content"] for message in await memory.get_messages(session_id, limit)]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_history_is_trimmed_to_max_messages(backend, tmp_path):
+    async def body(memory):
+        await add(memory, "s", 8)
+        assert await contents(memory, "s", 0) == ["m3", "m4", "m5", "m6", "m7"]
+        messages = await memory.get_messages("s", 1)
+        assert messages[0]["role"] == "assistant"
+        assert set(messages[0]) == {"role", "content", "timestamp"}
+
+    run(backend, tmp_path, body)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("limit,expected", [
+    (1, ["m3"]),
+    (3, ["m1", "m2", "m3"]),
+    (4, ["m0", "m1", "m2", "m3"]),
+    (10, ["m0", "m1", "m2", "m3"]),
+    (0, ["m0", "m1", "m2", "m3"]),
+])
+def test_limit_returns_newest_messages_oldest_first(backend, tmp_path, limit, expected):
+    async def body(memory):
+        await add(memory, "s", 4)
+        assert await contents(memory, "s", limit) == expected
+
+    run(backend, tmp_path, body)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_clear_only_affects_its_session(backend, tmp_path):
+    async def body(memory):
+        await add(memory, "a", 3)
+        await add(memory, "b", 2)
+        await memory.clear_messages("a")
+        await memory.clear_messages("never-used")
+        assert await contents(memory, "a") == []
+        assert await contents(memory, "b") == ["m0", "m1"]
+        await add(memory, "a", 1, start=7)
+        assert await contents(memory, "a") == ["m7"]
+
+    run(backend, tmp_path, body)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_unknown_session_is_empty(backend, tmp_path):
+    async def body(memory):
+        assert await memory.get_messages("nobody") == []
+
+    run(backend, tmp_path, body)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_least_recently_used_session_is_evicted(backend, tmp_path):
+    """Only the in-process backend caps sessions; the others keep every session"""
+    async def body(memory):
+        if backend == "memory":
+            memory.max_sessions = 2
+        await add(memory, "a", 1)
+        await add(memory, "b", 1)
+        await memory.get_messages("a")  # reading counts as use
+        await add(memory, "c", 1)
+        await add(memory, "a", 1, start=1)
+        return [await contents(memory, s) for s in ("a", "b", "c")]
+
+    a, b, c = run(backend, tmp_path, body)
+    assert a == ["m0", "m1"]
+    assert c == ["m0"]
+    assert b == ([] if backend == "memory" else ["m0"])
@@ -0,0 +1,59 @@
+import io
+import random
+
+import pytest
+
+from services.chunker import chunk_by_paragraphs, chunk_by_size, iter_chunks_by_paragraphs, iter_chunks_by_size
+from services.text_extractor import make_text_decoder
+
+# Newline variants, multi-byte characters (2, 3 and 4 bytes) and plain text
+TOKENS = ["a", "bc", " ", "  ", "\n", "\n\n", "\r\n", "\r\n\r\n", "\r", "é", "€", "😀", "word "]
+
+
+def random_text(rng):
+    return "".join(rng.choice(TOKENS) for _ in range(rng.randint(0, 300)))
+
+
+def read_like_open(data: bytes) -> str:
+    """What open(path, "r", encoding="utf-8", errors="ignore").read() returns"""
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="ignore").read()
+
+
+def decoded_pieces(data: bytes, rng):
+    """Decode data in random byte slices, splitting \r\n pairs and multi-byte characters"""
+    decoder = make_text_decoder()
+    cuts = sorted(rng.sample(range(1, len(data)), min(rng.randint(0, 20), len(data) - 1))) if len(data) > 1 else []
+    pieces = []
+    for start, stop in zip([0] + cuts, cuts + [len(data)]):
+        pieces.append(decoder.decode(data[start:stop]))
+    pieces.append(decoder.decode(b"", final=True))
+    return pieces
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_streaming_chunkers_match_whole_text(seed):
+    rng = random.Random(seed)
+    data = random_text(rng).encode("utf-8")
+    if rng.random() < 0.2:
+        data = data[:rng.randint(0, len(data))]  # may end inside a multi-byte character
+    text = read_like_open(data)
+    pieces = decoded_pieces(data, rng)
+    assert "".join(pieces) == text
+
+    assert list(iter_chunks_by_paragraphs(pieces)) == chunk_by_paragraphs(text)
+    size = rng.randint(1, 60)
+    overlap = rng.randint(0, size - 1)
+    assert list(iter_chunks_by_size(pieces, size, overlap)) == chunk_by_size(text, size, overlap)
+
+
+def test_single_character_pieces():
+    text = "first\n\nsecond line\nstill second\n\n\n\nthird"
+    assert list(iter_chunks_by_paragraphs(text)) == chunk_by_paragraphs(text)
+    assert list(iter_chunks_by_size(text, 7, 3)) == chunk_by_size(text, 7, 3)
+
+
+def test_size_arguments_are_validated_before_iteration():
+    with pytest.raises(ValueError):
+        iter_chunks_by_size([], 0)
+    with pytest.raises(ValueError):
+        iter_chunks_by_size([], 10, 10)
@@ -0,0 +1,128 @@
+import random
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from services.filters import MetadataIndex, RetrievalFilter, matches
+from services.vectorstore_local import LocalVectorStore
+
+FILES = ["a.txt", "b.txt", "c.pdf"]
+
+
+def make_metadata(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        meta = {"i": i, "filename": rng.choice(FILES), "chunk_strategy": rng.choice(["paragraph", "fixed"])}
+        if rng.random() < 0.9:
+            meta["uploaded_at_ts"] = float(rng.randint(0, 9))  # few distinct values, so boundaries repeat
+        rows.append(meta)
+    return rows
+
+
+def build_index(rows):
+    index = MetadataIndex()
+    for position, meta in enumerate(rows):
+        index.add(position, meta)
+    return index
+
+
+def brute_force(rows, metadata_filter):
+    return {i for i, meta in enumerate(rows) if matches(meta, metadata_filter)}
+
+
+FILTERS = [
+    {"filename": "a.txt"},
+    {"filename": {"$in": ["a.txt", "c.pdf"]}},
+    {"filename": {"$in": []}},
+    {"filename": {"$ne": "a.txt"}},
+    {"filename": {"$nin": ["a.txt", "b.txt"]}},
+    {"filename": {"$in": ["missing.txt"]}},
+    {"uploaded_at_ts": {"$gt": 4.0}},
+    {"uploaded_at_ts": {"$gte": 4.0}},
+    {"uploaded_at_ts": {"$lt": 4.0}},
+    {"uploaded_at_ts": {"$lte": 4.0}},
+    {"uploaded_at_ts": {"$gte": 4.0, "$lte": 4.0}},
+    {"uploaded_at_ts": {"$gt": 4.0, "$lt": 5.0}},
+    {"uploaded_at_ts": {"$ne": 4.0}},
+    {"uploaded_at_ts": {"$in": [0.0, 9.0]}},
+    {"uploaded_at_ts": {"$gt": 100.0}},
+    {"$or": [{"filename": "a.txt"}, {"uploaded_at_ts": {"$gte": 8.0}}]},
+    {"$or": [{"filename": "c.pdf"}, {"chunk_strategy": "fixed"}], "uploaded_at_ts": {"$lt": 3.0}},
+    {"$and": [{"filename": {"$ne": "b.txt"}}, {"$or": [{"i": {"$lt": 10}}, {"i": {"$gte": 190}}]}]},
+    {"i": {"$in": [3, 5, 7]}},  # not indexed: checked per row
+]
+
+
+@pytest.mark.parametrize("metadata_filter", FILTERS)
+def test_index_selects_what_matches_accepts(metadata_filter):
+    rows = make_metadata(200)
+    assert build_index(rows).select(metadata_filter, rows, len(rows)) == brute_force(rows, metadata_filter)
+
+
+def test_range_boundaries():
+    rows = [{"uploaded_at_ts": value} for value in (1.0, 2.0, 2.0, 3.0)]
+    index = build_index(rows)
+    assert index.select({"uploaded_at_ts": {"$gt": 2.0}}, rows, 4) == {3}
+    assert index.select({"uploaded_at_ts": {"$gte": 2.0}}, rows, 4) == {1, 2, 3}
+    assert index.select({"uploaded_at_ts": {"$lt": 2.0}}, rows, 4) == {0}
+    assert index.select({"uploaded_at_ts": {"$lte": 2.0}}, rows, 4) == {0, 1, 2}
+
+
+def test_unknown_operator_is_rejected():
+    rows = make_metadata(5)
+    with pytest.raises(ValueError):
+        build_index(rows).select({"uploaded_at_ts": {"$regex": "x"}}, rows, 5)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_index_stays_consistent_after_deletes(seed):
+    rng = random.Random(seed)
+    rows = make_metadata(300, seed)
+    store = LocalVectorStore(8, "float32", None, {})
+    vectors = np.random.default_rng(seed).normal(size=(len(rows), 8)).astype(np.float32)
+    store._add_sync(vectors, rows, [str(i) for i in range(len(rows))])
+    shard = store._shards[""]
+
+    # Each delete moves the last row into the freed position
+    remaining = list(range(len(rows)))
+    for _ in range(4):
+        doomed = rng.sample(remaining, 40) + [remaining[-1]]
+        store._delete_sync([str(i) for i in doomed])
+        remaining = [i for i in remaining if i not in doomed]
+        live = shard._metadata[:shard._size]
+        assert sorted(meta["i"] for meta in live) == remaining
+        for metadata_filter in FILTERS:
+            assert shard._index.select(metadata_filter, live, shard._size) == brute_force(live, metadata_filter)
+
+
+def test_retrieval_filter_compiles_to_metadata_filter():
+    after = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    before = datetime(2024, 2, 1)  # naive: taken as UTC
+    compiled = RetrievalFilter(
+        filename="a.txt", document_id=["d1", "d2"], chunk_strategy="fixed",
+        uploaded_after=after, uploaded_before=before,
+    ).to_metadata_filter()
+    assert compiled == {
+        "filename": {"$in": ["a.txt"]},
+        "document_id": {"$in": ["d1", "d2"]},
+        "chunk_strategy": {"$eq": "fixed"},
+        "uploaded_at_ts": {"$gte": after.timestamp(), "$lte": before.replace(tzinfo=timezone.utc).timestamp()},
+    }
+    assert RetrievalFilter().to_metadata_filter() is None
+
+
+def test_retrieval_filter_date_range_is_inclusive():
+    rows = [{"uploaded_at_ts": float(ts)} for ts in (99, 100, 150, 200, 201)]
+    compiled = RetrievalFilter(
+        uploaded_after=datetime.fromtimestamp(100, timezone.utc),
+        uploaded_before=datetime.fromtimestamp(200, timezone.utc),
+    ).to_metadata_filter()
+    assert build_index(rows).select(compiled, rows, len(rows)) == {1, 2, 3}
+
+
+def test_retrieval_filter_rejects_reversed_range():
+    with pytest.raises(ValidationError):
+        RetrievalFilter(uploaded_after=datetime(2024, 2, 1), uploaded_before=datetime(2024, 1, 1))
@@ -0,0 +1,74 @@
+import uuid
+
+TEXT = "Alpha beta gamma.\n\nDelta epsilon zeta eta theta.\n\nIota kappa lambda mu."
+
+
+def upload(client, tenant, text=TEXT, name="notes.txt"):
+    response = client.post(
+        "/ingest/upload",
+        files={"file": (name, text.encode(), "text/plain")},
+        headers={"X-Tenant-ID": tenant},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def chat(client, tenant, message):
+    response = client.post("/rag/rag/chat", json={"message": message}, headers={"X-Tenant-ID": tenant})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_delete_removes_vectors(app_client):
+    tenant = f"t{uuid.uuid4().hex[:8]}"
+    document = upload(app_client, tenant)
+    assert chat(app_client, tenant, "delta epsilon")["contexts_used"] > 0
+
+    response = app_client.delete(f"/ingest/documents/{document['document_id']}", headers={"X-Tenant-ID": tenant})
+    assert response.status_code == 200
+    assert chat(app_client, tenant, "delta epsilon")["contexts_used"] == 0
+
+
+def test_bulk_delete_removes_vectors(app_client):
+    tenant = f"t{uuid.uuid4().hex[:8]}"
+    first = upload(app_client, tenant)
+    second = upload(app_client, tenant, "Omicron pi rho sigma.", "other.txt")
+
+    response = app_client.post(
+        "/ingest/documents/bulk-delete",
+        json={"ids": [first["document_id"]]},
+        headers={"X-Tenant-ID": tenant},
+    )
+    assert response.status_code == 200
+    assert "Delta" not in chat(app_client, tenant, "delta epsilon")["response"]
+    assert "Omicron" in chat(app_client, tenant, "omicron pi")["response"]
+    assert second["num_chunks"] == 1
+
+
+def test_usage_totals_follow_uploads_and_deletes(app_client, monkeypatch):
+    import asyncio
+    from database import AsyncSessionLocal
+    from services import tenants
+
+    async def usage(tenant):
+        async with AsyncSessionLocal() as db:
+            return await tenants.get_usage(db, tenant)
+
+    tenant = f"t{uuid.uuid4().hex[:8]}"
+    first = upload(app_client, tenant)
+    upload(app_client, tenant, "Omicron pi rho sigma.", "other.txt")
+    assert asyncio.run(usage(tenant)) == tenants.TenantUsage(documents=0, vectors=0)  # quotas off: no query
+
+    monkeypatch.setattr(tenants, "TENANT_MAX_DOCUMENTS", 2)
+    assert asyncio.run(usage(tenant)) == tenants.TenantUsage(documents=2, vectors=first["num_chunks"] + 1)
+    response = app_client.post(
+        "/ingest/upload",
+        files={"file": ("third.txt", b"Tau upsilon.", "text/plain")},
+        headers={"X-Tenant-ID": tenant},
+    )
+    assert response.status_code == 403
+
+    app_client.delete(f"/ingest/documents/{first['document_id']}", headers={"X-Tenant-ID": tenant})
+    assert asyncio.run(usage(tenant)) == tenants.TenantUsage(documents=1, vectors=1)
+    upload(app_client, tenant, "Tau upsilon.", "third.txt")
+    assert asyncio.run(usage(tenant)).documents == 2
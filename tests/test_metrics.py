@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+
+from main import _path_prefix, app
+from services.metrics import REQUESTS_IN_FLIGHT, render_metrics
+
+
+class _Request:
+    def __init__(self, path):
+        self.url = type("URL", (), {"path": path})()
+
+
+def test_in_flight_prefix_is_bounded():
+    assert _path_prefix(_Request("/ingest/upload")) == "/ingest"
+    assert _path_prefix(_Request("/rag/rag/chat")) == "/rag"
+    assert _path_prefix(_Request("/")) == "/"
+    assert {_path_prefix(_Request(f"/junk{i}/x")) for i in range(5)} == {"other"}
+
+
+def test_unknown_paths_do_not_create_series():
+    client = TestClient(app)
+    for i in range(5):
+        client.get(f"/junk{i}/x")
+    output = render_metrics()
+    assert "junk" not in output
+    assert 'prefix="other"' in output
+    assert all(key[0] != "/junk0" for key in REQUESTS_IN_FLIGHT._values)
@@ -0,0 +1,26 @@
+import asyncio
+
+from services import profiling
+from services.profiling import RequestProfiler
+
+
+def _slow_request_profiled(monkeypatch, enabled: bool) -> bool:
+    monkeypatch.setattr(profiling.settings, "enabled", enabled)
+    monkeypatch.setattr(profiling.settings, "slow_ms", 10)
+
+    async def run():
+        profiler = RequestProfiler("chat", sampled=False)
+        await asyncio.sleep(0.05)
+        started = profiler.session.active
+        profiler.session.stop()
+        return started
+
+    return asyncio.run(run())
+
+
+def test_slow_requests_not_profiled_while_disabled(monkeypatch):
+    assert not _slow_request_profiled(monkeypatch, enabled=False)
+
+
+def test_slow_requests_profiled_while_enabled(monkeypatch):
+    assert _slow_request_profiled(monkeypatch, enabled=True)
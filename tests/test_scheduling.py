@@ -0,0 +1,87 @@
+from datetime import date, datetime
+
+import pytest
+
+from services import scheduling
+from services.scheduling import free_slots, parse_slot
+
+MONDAY = date(2099, 1, 5)
+SATURDAY = date(2099, 1, 3)
+ALL_SLOTS = [f"{h:02d}:{m:02d}" for h in range(9, 17) for m in (0, 30)]
+
+
+def at(day, hhmm):
+    return datetime.combine(day, datetime.strptime(hhmm, "%H:%M").time())
+
+
+def test_parse_slot_day_edges():
+    assert parse_slot("2099-01-05", "09:00") == at(MONDAY, "09:00")
+    assert parse_slot(" 2099-01-05 ", "16:30:45") == at(MONDAY, "16:30")
+    for time_str in ("08:30", "17:00", "16:45"):
+        with pytest.raises(ValueError):
+            parse_slot("2099-01-05", time_str)
+
+
+@pytest.mark.parametrize("date_str,time_str", [
+    ("2099-01-03", "10:00"),  # Saturday
+    ("2099-01-05", "10:15"),  # off the slot grid
+    ("05/01/2099", "10:00"),
+    ("2099-01-05", "ten"),
+])
+def test_parse_slot_rejects(date_str, time_str):
+    with pytest.raises(ValueError):
+        parse_slot(date_str, time_str)
+
+
+def test_weekends_are_bookable_when_configured(monkeypatch):
+    monkeypatch.setattr(scheduling, "WEEKDAYS_ONLY", False)
+    assert parse_slot("2099-01-03", "10:00") == at(SATURDAY, "10:00")
+    assert free_slots(SATURDAY, SATURDAY, [])[SATURDAY.isoformat()] == ALL_SLOTS
+
+
+def test_free_slots_skip_weekends_and_bookings():
+    booked = [at(MONDAY, "09:00"), at(MONDAY, "09:30"), at(MONDAY, "12:00"), at(MONDAY, "16:30")]
+    slots = free_slots(SATURDAY, MONDAY, booked)
+    assert list(slots) == [MONDAY.isoformat()]
+    expected = [s for s in ALL_SLOTS if s not in ("09:00", "09:30", "12:00", "16:30")]
+    assert slots[MONDAY.isoformat()] == expected
+
+
+def test_free_slots_across_days():
+    tuesday = date(2099, 1, 6)
+    booked = [at(MONDAY, "16:30"), at(tuesday, "09:00")]
+    slots = free_slots(MONDAY, tuesday, booked)
+    assert slots[MONDAY.isoformat()] == ALL_SLOTS[:-1]
+    assert slots[tuesday.isoformat()] == ALL_SLOTS[1:]
+    assert free_slots(MONDAY, MONDAY, [at(MONDAY, s) for s in ALL_SLOTS]) == {MONDAY.isoformat(): []}
+
+
+def book(client, date_str, time_str):
+    return client.post("/rag/rag/book-interview", json={
+        "name": "Ada", "email": "ada@example.com", "date": date_str, "time": time_str,
+    })
+
+
+def test_second_booking_of_a_slot_conflicts(app_client):
+    first = book(app_client, "2099-01-07", "11:00")
+    assert first.status_code == 200, first.text
+    assert book(app_client, "2099-01-07", "11:00").status_code == 409
+    assert book(app_client, "2099-01-07", "11:30").status_code == 200
+
+    availability = app_client.get("/rag/rag/availability", params={"start_date": "2099-01-07"}).json()
+    assert "11:00" not in availability["availability"]["2099-01-07"]
+    assert "10:30" in availability["availability"]["2099-01-07"]
+
+
+def test_past_and_invalid_slots_are_rejected(app_client):
+    assert book(app_client, "2000-01-03", "10:00").status_code == 400
+    assert book(app_client, "2099-01-03", "10:00").status_code == 400
+
+
+def test_now_is_taken_in_the_booking_timezone(monkeypatch):
+    from datetime import timezone
+    from zoneinfo import ZoneInfo
+
+    utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+    monkeypatch.setattr(scheduling, "BOOKING_TIMEZONE", ZoneInfo("Pacific/Kiritimati"))  # UTC+14, no DST
+    assert abs((scheduling.now_local() - utc_now).total_seconds() - 14 * 3600) < 60
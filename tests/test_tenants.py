@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from chat_memory import get_chat_memory
+from local_memory import InMemoryChatMemory
+from routers.rag import router as rag_router
+from services.tenants import DEFAULT_TENANT, session_key
+
+
+@pytest.fixture
+def memory():
+    return InMemoryChatMemory()
+
+
+@pytest.fixture
+def client(memory):
+    app = FastAPI()
+    app.include_router(rag_router)
+    app.dependency_overrides[get_chat_memory] = lambda: memory
+    return TestClient(app)
+
+
+def test_session_keys_do_not_collide():
+    assert session_key(DEFAULT_TENANT, "bar") == "bar"
+    assert session_key("foo", "bar") == "foo:bar"
+    with pytest.raises(ValueError):
+        session_key(DEFAULT_TENANT, "foo:bar")
+
+
+def test_default_tenant_cannot_read_other_tenant_session(client, memory):
+    asyncio.run(memory.add_message(session_key("foo", "bar"), "user", "secret"))
+
+    response = client.get("/rag/chat-history/foo:bar")
+    assert response.status_code == 400
+
+    response = client.get("/rag/chat-history/bar", headers={"X-Tenant-ID": "foo"})
+    assert response.status_code == 200
+    assert [m["content"] for m in response.json()["messages"]] == ["secret"]
+
+
+def test_other_tenant_session_cannot_be_cleared_or_written(client, memory):
+    asyncio.run(memory.add_message(session_key("foo", "bar"), "user", "secret"))
+
+    assert client.delete("/rag/chat-history/foo:bar").status_code == 400
+    assert client.post("/rag/chat", json={"message": "hi", "session_id": "foo:bar"}).status_code == 400
+    assert len(asyncio.run(memory.get_messages(session_key("foo", "bar")))) == 1
+
+
+def test_unconfigured_tenants_share_a_metric_label(monkeypatch):
+    from services import tenants
+
+    monkeypatch.setattr(tenants, "METRICS_TENANTS", frozenset({"acme"}))
+    assert tenants.tenant_label(DEFAULT_TENANT) == DEFAULT_TENANT
+    assert tenants.tenant_label("acme") == "acme"
+    assert tenants.tenant_label("random-123") == tenants.OTHER_TENANT_LABEL
+
+
+def test_document_counts_are_bounded(monkeypatch):
+    from routers import ingest
+
+    monkeypatch.setattr(ingest, "DOCUMENT_COUNT_MAX_TENANTS", 3)
+    monkeypatch.setattr(ingest, "_document_counts", type(ingest._document_counts)())
+    for i in range(10):
+        ingest.document_count(f"t{i}")
+    assert list(ingest._document_counts) == ["t7", "t8", "t9"]
+    ingest.document_count("t7")
+    ingest.document_count("t10")
+    assert list(ingest._document_counts) == ["t9", "t7", "t10"]
@@ -0,0 +1,205 @@
+import os
+
+import numpy as np
+import pytest
+
+from services import quantization
+from services.vectorstore_local import LocalVectorStore
+
+DIMENSION = 96  # divisible by the default PQ subvectors
+
+
+@pytest.fixture(autouse=True)
+def small_pq(monkeypatch):
+    monkeypatch.setattr(quantization, "PQ_MIN_TRAIN", 300)
+
+
+def make_vectors(n, dimension=DIMENSION, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def fill(store, vectors, namespace=""):
+    ids = [str(i) for i in range(len(vectors))]
+    store._add_sync(vectors, [{"i": i, "filename": f"f{i % 3}"} for i in range(len(vectors))], ids, namespace)
+
+
+def top_ids(store, vector, k=1, namespace="", metadata_filter=None):
+    return [meta["i"] for meta in store._query_sync(vector, k, namespace, metadata_filter)]
+
+
+def crash(store):
+    """Drop a store without saving, releasing its directory lock as process exit would"""
+    store._closed.set()
+    store._directory_lock.close()
+
+
+@pytest.mark.parametrize("compression", quantization.COMPRESSIONS)
+def test_save_and_reload(tmp_path, compression):
+    vectors = make_vectors(500)
+    store = LocalVectorStore(DIMENSION, compression, str(tmp_path), {})
+    fill(store, vectors)
+    fill(store, vectors[:50], namespace="acme")
+    store.save()
+    expected = [top_ids(store, v, 5) for v in vectors[:20]]
+    crash(store)
+
+    reloaded = LocalVectorStore(DIMENSION, compression, str(tmp_path), {})
+    assert reloaded.namespaces() == {"": 500, "acme": 50}
+    assert reloaded.stats()[""]["compression"] == compression
+    assert [top_ids(reloaded, v, 5) for v in vectors[:20]] == expected
+    assert top_ids(reloaded, vectors[7], 1, metadata_filter={"filename": "f1"}) == [7]
+
+
+@pytest.mark.parametrize("compression", quantization.COMPRESSIONS)
+def test_delete_then_reload(tmp_path, compression):
+    vectors = make_vectors(400)
+    store = LocalVectorStore(DIMENSION, compression, str(tmp_path), {})
+    fill(store, vectors)
+    store._delete_sync(["0", "5", "399"])
+    store.save()
+    crash(store)
+
+    reloaded = LocalVectorStore(DIMENSION, compression, str(tmp_path), {})
+    assert len(reloaded) == 397
+    assert 0 not in top_ids(reloaded, vectors[0], 5)
+    assert top_ids(reloaded, vectors[398], 1) == [398]
+    assert top_ids(reloaded, vectors[6], 1) == [6]
+
+
+def test_unsaved_changes_do_not_touch_saved_files(tmp_path):
+    vectors = make_vectors(400)
+    store = LocalVectorStore(DIMENSION, "int8", str(tmp_path), {})
+    fill(store, vectors)
+    store.save()
+    store._delete_sync(["0"])
+    store._add_sync(make_vectors(10, seed=1), [{"i": -1}] * 10, [f"new{i}" for i in range(10)])
+    crash(store)
+
+    reloaded = LocalVectorStore(DIMENSION, "int8", str(tmp_path), {})
+    assert len(reloaded) == 400
+    assert top_ids(reloaded, vectors[0], 1) == [0]
+    assert top_ids(reloaded, vectors[399], 1) == [399]
+
+
+@pytest.mark.parametrize("source,target", [("float32", "pq"), ("pq", "int8"), ("int8", "float32")])
+def test_rebuild_between_modes(tmp_path, source, target):
+    vectors = make_vectors(500)
+    store = LocalVectorStore(DIMENSION, source, str(tmp_path), {})
+    fill(store, vectors)
+    store.rebuild(target)
+    assert store.stats()[""]["compression"] == target
+    assert top_ids(store, vectors[3], 1) == [3]
+    store.save()
+    crash(store)
+
+    reloaded = LocalVectorStore(DIMENSION, target, str(tmp_path), {})
+    assert reloaded.stats()[""]["compression"] == target
+    assert len(reloaded) == 500
+    assert top_ids(reloaded, vectors[3], 1) == [3]
+
+
+def test_failed_rebuild_keeps_vectors(tmp_path):
+    dimension = 100  # not divisible by the PQ subvectors
+    vectors = make_vectors(50, dimension)
+    store = LocalVectorStore(dimension, "float32", str(tmp_path), {})
+    fill(store, vectors)
+    store.save()
+    with pytest.raises(ValueError):
+        store.rebuild("pq")
+    assert top_ids(store, vectors[10], 1) == [10]
+    crash(store)
+
+    reloaded = LocalVectorStore(dimension, "float32", str(tmp_path), {})
+    assert top_ids(reloaded, vectors[10], 1) == [10]
+
+
+def test_pq_before_and_after_training(tmp_path):
+    vectors = make_vectors(400)
+    store = LocalVectorStore(DIMENSION, "pq", str(tmp_path), {})
+    fill(store, vectors[:100])
+    storage = store._shards[""]._storage
+    assert storage.codebooks is None
+    assert top_ids(store, vectors[42], 1) == [42]
+
+    store._add_sync(vectors[100:], [{"i": i} for i in range(100, 400)], [str(i) for i in range(100, 400)])
+    assert storage.codebooks is not None
+    assert top_ids(store, vectors[42], 1) == [42]
+    assert top_ids(store, vectors[350], 1) == [350]
+    store.save()
+    crash(store)
+
+    reloaded = LocalVectorStore(DIMENSION, "pq", str(tmp_path), {})
+    assert reloaded._shards[""]._storage.codebooks is not None
+    assert top_ids(reloaded, vectors[350], 1) == [350]
+
+
+def test_second_process_is_refused(tmp_path):
+    store = LocalVectorStore(DIMENSION, "float32", str(tmp_path), {})
+    with pytest.raises(RuntimeError):
+        LocalVectorStore(DIMENSION, "float32", str(tmp_path), {})
+    crash(store)
+    LocalVectorStore(DIMENSION, "float32", str(tmp_path), {})
+
+
+FORKED_WORKER = """
+import asyncio, os, sys
+import main  # what gunicorn's preload_app does in the master
+from services import vectorstore
+assert vectorstore._vectorstore is None, "store opened at import"
+pid = os.fork()
+if pid == 0:
+    try:
+        asyncio.run(main.startup_event())
+        vectorstore.get_vectorstore()._add_sync([[1.0] * 384], [{"i": 1}], ["a"])
+        asyncio.run(main.shutdown_event())
+    except BaseException as e:
+        print(repr(e), file=sys.stderr)
+        os._exit(1)
+    os._exit(0)
+_, status = os.waitpid(pid, 0)
+sys.exit(os.waitstatus_to_exitcode(status))
+"""
+
+
+def test_store_is_opened_in_forked_worker(tmp_path):
+    import subprocess
+    import sys
+
+    env = dict(os.environ, VECTOR_STORE_BACKEND="local", CHAT_MEMORY_BACKEND="memory",
+               LOCAL_VECTOR_DIR=str(tmp_path / "vectors"),
+               DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", FORKED_WORKER], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+
+    reloaded = LocalVectorStore(384, "float32", str(tmp_path / "vectors"), {})
+    assert reloaded.namespaces() == {"": 1}
+
+
+def test_changed_shards_are_saved_in_the_background(tmp_path):
+    import time
+
+    store = LocalVectorStore(DIMENSION, "float32", str(tmp_path), {}, save_interval=0.05)
+    fill(store, make_vectors(10))
+    deadline = time.monotonic() + 5
+    while store._shards[""].dirty and time.monotonic() < deadline:
+        time.sleep(0.05)
+    crash(store)
+
+    reloaded = LocalVectorStore(DIMENSION, "float32", str(tmp_path), {}, save_interval=0)
+    assert len(reloaded) == 10
+
+
+def test_rescoring_files_live_in_the_store_directory(tmp_path):
+    temp_dir = tmp_path / "tmp"
+    temp_dir.mkdir()
+    (temp_dir / "vectors_stale.f32").write_bytes(b"left by a crashed process")
+    store = LocalVectorStore(DIMENSION, "int8", str(tmp_path), {})
+    fill(store, make_vectors(10))
+    path = store._shards[""]._storage.originals.path
+    assert os.path.dirname(path) == str(temp_dir)
+    assert os.listdir(temp_dir) == [os.path.basename(path)]
+    crash(store)